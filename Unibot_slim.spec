@@ -0,0 +1,50 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Slim build: the chat bot only needs the stdlib catalog loader, so pandas/numpy
+# are left out entirely. Use Unibot.spec if you need load_df() analytics in the EXE.
+
+datas = [('data\\unilife.csv', 'data')]
+binaries = []
+hiddenimports = []
+
+
+a = Analysis(
+    ['unibot.py'],
+    pathex=[],
+    binaries=binaries,
+    datas=datas,
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['pandas', 'numpy', 'gradio', 'tkinter'],
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='Unibot',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='Unibot',
+)
@@ -1,5 +1,7 @@
 # Social -> Events: show 3 soonest from data/unilife.csv
+import heapq
 import re
+from datetime import date
 from pathlib import Path
 import pandas as pd
 from typing import Optional
@@ -95,26 +97,40 @@ MONTH = {
 }
 
 
+EVENT_DATE = re.compile(r"\((\d{1,2})\s*([A-Za-z]+)\)")
+LOOSE_DATE = re.compile(r"(\d{1,2})\s*([A-Za-z]+)")
+
+
 def load_events():
     df = pd.read_csv(CSV)
     df.columns = [c.strip().lower() for c in df.columns]
     return [str(x).strip() for x in df["events"].tolist()]
 
 
-def three_soonest(events):
-    parsed = []
+def days_until(mon: int, day: int, today: date) -> int:
+    """Days from ``today`` to the next (mon, day), wrapping into next year."""
+    for year in range(today.year, today.year + 9):  # 29 Feb needs a leap year
+        try:
+            when = date(year, mon, day)
+        except ValueError:
+            continue
+        if when >= today:
+            return (when - today).days
+    return 10**6  # not a real date (31 Apr) → last
+
+
+def three_soonest(events, today: Optional[date] = None):
+    today = today or date.today()
+    keyed = []
     for label in events:
-        m = re.search(r"\((\d{1,2})\s*([A-Za-z]+)\)", label) or re.search(
-            r"(\d{1,2})\s*([A-Za-z]+)", label
-        )
-        if m:
-            day = int(m.group(1))
-            mon = MONTH.get(m.group(2).lower(), 13)
-            parsed.append((label, mon, day))
+        m = EVENT_DATE.search(label) or LOOSE_DATE.search(label)
+        mon = MONTH.get(m.group(2).lower()) if m else None
+        if mon:
+            keyed.append((days_until(mon, int(m.group(1)), today), label))
         else:
-            parsed.append((label, 13, 99))
-    parsed.sort(key=lambda x: (x[1], x[2], x[0]))
-    return [label for (label, _, _) in parsed[:3]]
+            keyed.append((10**6, label))
+    # heap selection: O(n log 3) instead of sorting every event
+    return [label for (_, label) in heapq.nsmallest(3, keyed)]
 
 
 # --- tiny CLI ---
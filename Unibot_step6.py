@@ -12,7 +12,12 @@ from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 import pandas as pd
 
+from unibot_events import KeywordIndex, keyword_index
+from unibot_model import load_model
+from unibot_recommend import SportRecommender, build_sport_recommender, recommend_sports
+
 CSV = Path("data/unilife.csv")
+MODEL = Path("data/topic_model.nbm")  # `python unibot_model.py train ...`
 
 
 # ---------- Utilities ----------
@@ -93,7 +98,13 @@ KEYS = {
 }
 
 
+# Trained model when present (mapped once); the keyword lists below are the fallback
+TOPIC_MODEL = load_model(MODEL) if MODEL.exists() else None
+
+
 def classify_with_conf(text: str) -> Tuple[Optional[str], float, Dict[str, int]]:
+    if TOPIC_MODEL is not None:
+        return TOPIC_MODEL.classify(text)
     t = (text or "").lower()
     scores = {}
     hits = {}
@@ -161,28 +172,29 @@ def parse_events(events: List[str]) -> List[Tuple[str, int, int]]:
     return parsed
 
 
-def filter_events_by_vibe(
-    sorted_events: List[Tuple[str, int, int]], vibe: str, energy: str
-) -> List[str]:
+FUN_WORDS = {
+    "chill": {"picnic", "dinner", "thanksgiving", "language", "poetry"},
+    "hype": {"party", "carnival", "karaoke", "halloween"},
+    "creative": {"painting", "film", "music", "poetry"},
+}
+
+
+def event_index(sorted_events: List[Tuple[str, int, int]]) -> KeywordIndex:
+    """Fun word → events mentioning it; ids keep the chronological order."""
+    vocab = set().union(*FUN_WORDS.values())
+    return keyword_index([label for label, _, _ in sorted_events], vocab)
+
+
+def filter_events_by_vibe(events: KeywordIndex, vibe: str, energy: str) -> List[str]:
     vibe = (vibe or "").lower()
     energy = (energy or "").lower()
-    fun_words = {
-        "chill": {"picnic", "dinner", "thanksgiving", "language", "poetry"},
-        "hype": {"party", "carnival", "karaoke", "halloween"},
-        "creative": {"painting", "film", "music", "poetry"},
-    }
-    liked = fun_words.get(
+    liked = FUN_WORDS.get(
         "chill" if "low" in energy else "hype" if "high" in energy else "creative",
         set(),
     )
     # also bias by vibe words if matched
-    liked |= fun_words.get(vibe, set())
-    out = []
-    for label, _, _ in sorted_events:
-        low = label.lower()
-        if any(k in low for k in liked) or not liked:
-            out.append(label)
-    return out[:3] if out else [x[0] for x in sorted_events[:3]]
+    liked = liked | FUN_WORDS.get(vibe, set())
+    return events.first(3, liked) or list(events.labels[:3])
 
 
 # ---------- Associations ----------
@@ -225,84 +237,6 @@ def assoc_by_vibe(associations: List[str], vibe: str) -> str:
     return associations[0] if associations else "Debate Club"
 
 
-# ---------- Sports advanced ----------
-TYPE_MAP = {
-    "team": ["football", "basketball"],
-    "ball": ["football", "basketball", "tennis", "table tennis"],
-    "cardio": ["running", "swimming", "badminton"],
-    "strength": ["aikido"],
-    "martial": ["aikido"],
-    "racket": ["tennis", "badminton", "table tennis"],
-    "indoor": ["table tennis", "aikido", "badminton", "basketball"],
-    "outdoor": ["football", "running", "tennis"],
-}
-
-
-def recommend_sport(
-    sports_avail: set[str],
-    pref: str,
-    time_commit: str,
-    indoor_outdoor: str,
-    partner: str,
-) -> str:
-    pref = (pref or "").lower()
-    time_commit = (time_commit or "").lower()
-    indoor_outdoor = (indoor_outdoor or "").lower()
-    partner = (partner or "").lower()
-
-    # collate preference lists
-    candidates = []
-
-    def add_list(keys: List[str]):
-        for k in keys:
-            for s in TYPE_MAP.get(k, []):
-                if s in sports_avail and s not in candidates:
-                    candidates.append(s)
-
-    # seed by pref word
-    for key in TYPE_MAP:
-        if key in pref:
-            add_list([key])
-
-    # indoor/outdoor bias
-    if "indoor" in indoor_outdoor:
-        add_list(["indoor"])
-    elif "outdoor" in indoor_outdoor:
-        add_list(["outdoor"])
-
-    # partner requirement bias
-    if "solo" in partner:
-        # prefer solo-friendly
-        soloish = ["running", "aikido", "tennis", "table tennis", "swimming"]
-        for s in soloish:
-            if s in sports_avail and s not in candidates:
-                candidates.append(s)
-    elif "partner" in partner or "friends" in partner:
-        socialish = ["basketball", "football", "badminton"]
-        for s in socialish:
-            if s in sports_avail and s not in candidates:
-                candidates.append(s)
-
-    # time commitment heuristic
-    if "low" in time_commit:
-        low = ["running", "yoga", "table tennis", "badminton"]
-        for s in low:
-            if s in sports_avail and s not in candidates:
-                candidates.append(s)
-    elif "high" in time_commit:
-        hi = ["basketball", "football", "aikido", "swimming", "tennis"]
-        for s in hi:
-            if s in sports_avail and s not in candidates:
-                candidates.append(s)
-
-    # fallback: anything available
-    for s in sports_avail:
-        if s not in candidates:
-            candidates.append(s)
-
-    return candidates[0].title() if candidates else "Basketball"
-
-
 # ---------- Studying flow ----------
 def studying_flow():
     print(
@@ -327,15 +261,14 @@ def studying_flow():
 
 
 # ---------- Social flow ----------
-def social_flow(profile: Dict[str, str], df: pd.DataFrame):
+def social_flow(profile: Dict[str, str], df: pd.DataFrame, events: KeywordIndex):
     print(
         "Are you looking for upcoming events or to join an association? (events/association)"
     )
     kind = ask("> ").lower()
     if kind.startswith("event"):
-        ev_sorted = parse_events(df["events"].tolist())
         picks = filter_events_by_vibe(
-            ev_sorted, profile.get("vibe", ""), profile.get("energy", "")
+            events, profile.get("vibe", ""), profile.get("energy", "")
         )
         print("🎉 Handpicked events for your vibe/energy:")
         for e in picks:
@@ -353,7 +286,7 @@ def social_flow(profile: Dict[str, str], df: pd.DataFrame):
 
 
 # ---------- Sports flow ----------
-def sports_flow(df: pd.DataFrame):
+def sports_flow(df: pd.DataFrame, sport_rec: SportRecommender):
     sports = set(df["sports"].astype(str).str.lower().tolist())
 
     print("Do you have a specific sport in mind? (yes/no)")
@@ -380,10 +313,12 @@ def sports_flow(df: pd.DataFrame):
     io = ask("Indoor or outdoor vibes? (indoor/outdoor/any): ")
     partner = ask("Going solo or with friends? (solo/partner/friends): ")
 
-    rec = recommend_sport(sports, pref, time_commit, io, partner)
-    print(f"➡️ Recommendation: {rec}")
+    picks = recommend_sports(sport_rec, pref, time_commit, io, partner)
+    print(f"➡️ Recommendation: {picks[0]}")
+    if len(picks) > 1:
+        print("   Runners-up: " + ", ".join(picks[1:]))
     print(
-        "(Why: combined preference keywords + indoor/outdoor + partner need + time commitment; fallback = first available.)"
+        "(Why: weighted match of preference + indoor/outdoor + partner + time against each sport's attributes; fallback = first available.)"
     )
 
 
@@ -402,6 +337,8 @@ def build_profile() -> Dict[str, str]:
 # ---------- Main ----------
 def main():
     df = load_csv()
+    events = event_index(parse_events(df["events"].tolist()))
+    sport_rec = build_sport_recommender(df["sports"].tolist())
     profile = build_profile()
 
     print("\n👋 What can I help you with today? (free text)")
@@ -425,14 +362,14 @@ def main():
     # Explain why (simple hits-based reason)
     reason = ", ".join([f"{k}:{v}" for k, v in hits.items()])
     print(f"\n✅ Topic: {topic}  (confidence≈{int((conf or 0) * 100)}%)")
-    print(f"(Why: keyword hits → {reason})\n")
+    print(f"(Why: hits per topic → {reason})\n")
 
     if topic == "studying":
         studying_flow()
     elif topic == "sports":
-        sports_flow(df)
+        sports_flow(df, sport_rec)
     else:
-        social_flow(profile, df)
+        social_flow(profile, df, events)
 
 
 if __name__ == "__main__":
@@ -4,8 +4,9 @@
 # - Clarifying question if low confidence → MC fallback [1/2/3]
 # - Studying: struggling vs practical → share? → advisor/study group/Student Desk
 # - Sports: exact check or personalized rec (type + time + indoor/outdoor + partner)
-# - Social: events (3 soonest, vibe/energy-aware) or association (vibe-mapped)
-# Requirements: pandas installed; CSV at data/unilife.csv
+# - Social: events (3 soonest, vibe/energy-aware) or associations (top 3, scored on
+#   free text + the whole profile)
+# Requirements: pandas installed; CSV at data/unilife.csv (+ data/sport_attributes.csv)
 
 from __future__ import annotations
 import re
@@ -13,7 +14,18 @@ from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 import pandas as pd
 
+from unibot_events import KeywordIndex, keyword_index
+from unibot_model import load_model
+from unibot_recommend import (
+    AssociationRecommender,
+    SportRecommender,
+    build_recommender,
+    build_sport_recommender,
+    recommend_sports,
+)
+
 CSV = Path("data/unilife.csv")
+MODEL = Path("data/topic_model.nbm")  # `python unibot_model.py train ...`
 
 
 # -------------------- Utilities --------------------
@@ -101,7 +113,13 @@ KEYS = {
 }
 
 
+# Trained model when present (mapped once); the keyword lists below are the fallback
+TOPIC_MODEL = load_model(MODEL) if MODEL.exists() else None
+
+
 def classify_with_conf(text: str) -> Tuple[Optional[str], float, Dict[str, int]]:
+    if TOPIC_MODEL is not None:
+        return TOPIC_MODEL.classify(text)
     t = (text or "").lower()
     scores, hits = {}, {}
     for topic, cfg in KEYS.items():
@@ -161,130 +179,33 @@ def parse_events(ev: List[str]) -> List[Tuple[str, int, int]]:
     return out
 
 
-def filter_events_by_profile(
-    sorted_events: List[Tuple[str, int, int]], vibe: str, energy: str
-) -> List[str]:
+EVENT_BUCKETS = {
+    "chill": {"picnic", "dinner", "thanksgiving", "language", "poetry"},
+    "hype": {"party", "carnival", "karaoke", "halloween"},
+    "creative": {"painting", "film", "music", "poetry"},
+    "debate": {"debate"},
+    "tech": {"science"},
+}
+
+
+def event_index(sorted_events: List[Tuple[str, int, int]]) -> KeywordIndex:
+    """Bucket keyword → events mentioning it; ids keep the chronological order."""
+    vocab = set().union(*EVENT_BUCKETS.values())
+    return keyword_index([lbl for (lbl, _, _) in sorted_events], vocab)
+
+
+def filter_events_by_profile(events: KeywordIndex, vibe: str, energy: str) -> List[str]:
     vibe = (vibe or "").lower()
     energy = (energy or "").lower()
-    buckets = {
-        "chill": {"picnic", "dinner", "thanksgiving", "language", "poetry"},
-        "hype": {"party", "carnival", "karaoke", "halloween"},
-        "creative": {"painting", "film", "music", "poetry"},
-        "debate": {"debate"},
-        "tech": {"science"},
-    }
     liked = set()
     if "low" in energy:
-        liked |= buckets["chill"]
+        liked |= EVENT_BUCKETS["chill"]
     elif "high" in energy:
-        liked |= buckets["hype"]
+        liked |= EVENT_BUCKETS["hype"]
     else:
-        liked |= buckets["creative"]
-    liked |= buckets.get(vibe, set())
-    picks = [
-        lbl for (lbl, _, _) in sorted_events if any(k in lbl.lower() for k in liked)
-    ]
-    return picks[:3] or [x[0] for x in sorted_events[:3]]
-
-
-# -------------------- Associations --------------------
-ASSOC_PREFS = {
-    "international": "Language Club",
-    "debate": "Debate Club",
-    "science": "Science Society",
-    "art": "Painting and Pottery",
-    "poetry": "Poetry Pals",
-    "music": "Music Band",
-    "film": "Film Appreciation",
-    "startup": "Entrepreneur Society",
-    "yoga": "Yoga Circle",
-    "language": "Language Club",
-    "creative": "Painting and Pottery",
-    "tech": "Science Society",
-}
-
-
-def association_for_vibe(associations: List[str], vibe: str) -> str:
-    vibe = (vibe or "").lower()
-    vibe_map = {
-        "chill": "yoga",
-        "hype": "music",
-        "creative": "art",
-        "debate": "debate",
-        "tech": "science",
-        "startup": "startup",
-        "international": "language",
-    }
-    kw = vibe_map.get(vibe)
-    if kw and kw in ASSOC_PREFS:
-        prefer = ASSOC_PREFS[kw]
-        for a in associations:
-            if a.lower() == prefer.lower():
-                return a
-    return associations[0] if associations else "Debate Club"
-
-
-# -------------------- Sports --------------------
-TYPE_MAP = {
-    "team": ["football", "basketball"],
-    "ball": ["football", "basketball", "tennis", "table tennis"],
-    "cardio": ["running", "swimming", "badminton"],
-    "strength": ["aikido"],
-    "martial": ["aikido"],
-    "racket": ["tennis", "badminton", "table tennis"],
-    "indoor": ["table tennis", "aikido", "badminton", "basketball"],
-    "outdoor": ["football", "running", "tennis"],
-}
-
-
-def recommend_sport(
-    avail: set[str], pref: str, time_commit: str, place: str, partner: str
-) -> str:
-    pref = (pref or "").lower()
-    time_commit = (time_commit or "").lower()
-    place = (place or "").lower()
-    partner = (partner or "").lower()
-
-    candidates: List[str] = []
-
-    def add_list(keys: List[str]):
-        for k in keys:
-            for s in TYPE_MAP.get(k, []):
-                if s in avail and s not in candidates:
-                    candidates.append(s)
-
-    for key in TYPE_MAP:
-        if key in pref:
-            add_list([key])
-
-    if "indoor" in place:
-        add_list(["indoor"])
-    elif "outdoor" in place:
-        add_list(["outdoor"])
-
-    if "solo" in partner:
-        for s in ["running", "aikido", "tennis", "table tennis", "swimming"]:
-            if s in avail and s not in candidates:
-                candidates.append(s)
-    elif "partner" in partner or "friends" in partner:
-        for s in ["basketball", "football", "badminton"]:
-            if s in avail and s not in candidates:
-                candidates.append(s)
-
-    if "low" in time_commit:
-        for s in ["running", "yoga", "table tennis", "badminton"]:
-            if s in avail and s not in candidates:
-                candidates.append(s)
-    elif "high" in time_commit:
-        for s in ["basketball", "football", "aikido", "swimming", "tennis"]:
-            if s in avail and s not in candidates:
-                candidates.append(s)
-
-    for s in avail:
-        if s not in candidates:
-            candidates.append(s)
-
-    return candidates[0].title() if candidates else "Basketball"
+        liked |= EVENT_BUCKETS["creative"]
+    liked |= EVENT_BUCKETS.get(vibe, set())
+    return events.first(3, liked) or list(events.labels[:3])
 
 
 # -------------------- Branch flows (per brief) --------------------
@@ -310,7 +231,7 @@ def studying_flow():
         )
 
 
-def sports_flow(df: pd.DataFrame):
+def sports_flow(df: pd.DataFrame, sport_rec: SportRecommender):
     sports = set(df["sports"].astype(str).str.lower())
     print("Do you have a specific sport in mind? (yes/no)")
     if ask("> ").lower().startswith("y"):
@@ -332,22 +253,28 @@ def sports_flow(df: pd.DataFrame):
     time_commit = ask("Q2) Time commitment? (low/medium/high): ")
     place = ask("Q3) Indoor or outdoor? (indoor/outdoor/any): ")
     partner = ask("Q4) Solo or with friends? (solo/partner/friends): ")
-    rec = recommend_sport(sports, pref, time_commit, place, partner)
-    print(f"➡️ Recommendation: {rec}")
+    picks = recommend_sports(sport_rec, pref, time_commit, place, partner)
+    print(f"➡️ Recommendation: {picks[0]}")
+    if len(picks) > 1:
+        print("   Runners-up: " + ", ".join(picks[1:]))
     print(
-        "(Why: combined type + place + partner + time; fallback = first available in CSV.)"
+        "(Why: weighted type + place + partner + time match on sport attributes; fallback = first in CSV.)"
     )
 
 
-def social_flow(profile: Dict[str, str], df: pd.DataFrame):
+def social_flow(
+    profile: Dict[str, str],
+    df: pd.DataFrame,
+    events: KeywordIndex,
+    assocs: AssociationRecommender,
+):
     print(
         "Are you looking for upcoming events or to join an association? (events/association)"
     )
     kind = ask("> ").lower()
     if kind.startswith("event"):
-        ev_sorted = parse_events(df["events"].tolist())
         picks = filter_events_by_profile(
-            ev_sorted, profile.get("vibe", ""), profile.get("energy", "")
+            events, profile.get("vibe", ""), profile.get("energy", "")
         )
         print("🎉 Handpicked events (considering your vibe/energy):")
         for e in picks:
@@ -356,10 +283,17 @@ def social_flow(profile: Dict[str, str], df: pd.DataFrame):
             "(Why: matched vibe/energy keywords; fallback = earliest chronologically.)"
         )
     else:
-        assoc = df["associations"].tolist()
-        pick = association_for_vibe(assoc, profile.get("vibe", ""))
-        print(f"➡️ Try the association: {pick}")
-        print("(Why: mapped your vibe to association theme; fallback = first in CSV.)")
+        text = ask("What would you like from an association? (free text): ")
+        picks = assocs.top(text, profile, 3)
+        if picks:
+            print("➡️ Associations that fit you best:")
+            for name, score in picks:
+                print(f" • {name} (score {score:.2f})")
+            print("(Why: scored every association on your words + vibe/energy/social/budget.)")
+        else:
+            assoc = df["associations"].tolist()
+            print(f"➡️ Try the association: {assoc[0] if assoc else 'Debate Club'}")
+            print("(Why: nothing matched your words or profile; fallback = first in CSV.)")
 
 
 # -------------------- Profile (open-ended first) --------------------
@@ -377,6 +311,9 @@ def build_profile() -> Dict[str, str]:
 # -------------------- Main --------------------
 def main():
     df = load_csv()
+    events = event_index(parse_events(df["events"].tolist()))
+    sport_rec = build_sport_recommender(df["sports"].tolist())
+    assocs = build_recommender(df["associations"].tolist())
     profile = build_profile()
 
     print("\n👋 What can I help you with today? (free text)")
@@ -398,14 +335,14 @@ def main():
 
     why = ", ".join([f"{k}:{v}" for k, v in hits.items()])
     print(f"\n✅ Topic: {topic} (confidence≈{int(conf * 100)}%)")
-    print(f"(Why: keyword hits → {why})\n")
+    print(f"(Why: hits per topic → {why})\n")
 
     if topic == "studying":
         studying_flow()
     elif topic == "sports":
-        sports_flow(df)
+        sports_flow(df, sport_rec)
     else:
-        social_flow(profile, df)
+        social_flow(profile, df, events, assocs)
 
 
 if __name__ == "__main__":
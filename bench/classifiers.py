@@ -0,0 +1,276 @@
+# Classifier benchmark: accuracy, None/tie rate and per-call latency of every variant
+# Usage:
+#   python bench/classifiers.py                        # synthetic corpus, table only
+#   python bench/classifiers.py --json results.json    # + machine-readable results
+#   python bench/classifiers.py --corpus labels.csv    # your own text,topic CSV
+#   python bench/classifiers.py --write-corpus c.csv   # dump the synthetic corpus
+#   python bench/classifiers.py --model data/topic_model.nbm   # also score a trained model
+# The synthetic corpus is seeded, so the same --size/--seed gives the same utterances;
+# its sha256 goes into the JSON so results from different corpora aren't compared.
+from __future__ import annotations
+import argparse
+import contextlib
+import csv
+import hashlib
+import importlib.util
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+Corpus = List[Tuple[str, str]]  # (utterance, topic or "none")
+NONE_LABEL = "none"
+
+PHRASES: Dict[str, List[str]] = {
+    "studying": [
+        "I need help with my {subject} exam",
+        "where is the library",
+        "when is the {subject} assignment deadline",
+        "can I talk to an academic advisor",
+        "how do I enrol in a {subject} course",
+        "my timetable is a mess",
+        "I'm struggling with {subject} homework",
+        "where can I revise quietly",
+        "I failed my {subject} midterm",
+        "how do I register for modules",
+        "is there a study group for {subject}",
+        "what are my grades",
+        "exam schedule please",
+    ],
+    "sports": [
+        "where is the gym",
+        "I want to play {sport}",
+        "is there a {sport} team",
+        "how do I join table tennis",
+        "I love running",
+        "is there a swimming pool",
+        "I want to get fit",
+        "can I go {sport} on campus",
+        "looking for {sport} training",
+        "yoga classes",
+        "I'd like to lift weights",
+        "any sports for beginners",
+        "workout buddies?",
+    ],
+    "social": [
+        "any parties this week",
+        "I want to meet new people",
+        "what events are on",
+        "is there a karaoke night",
+        "I'd like to join a {club} society",
+        "looking for friends",
+        "any concerts near campus",
+        "Halloween plans?",
+        "I feel lonely",
+        "is there a {club} club",
+        "dinner with other students",
+        "fun things to do tonight",
+        "a picnic or a festival maybe",
+    ],
+    NONE_LABEL: [
+        "hi",
+        "hello there",
+        "what can you do",
+        "my shower is broken",
+        "I need a refund for my parking permit",
+        "where can I get brunch",
+        "thanks",
+        "what's the wifi password",
+        "tell me a joke",
+        "I lost my student card",
+        "how do I print",
+        "the heating in my room doesn't work",
+    ],
+}
+SLOTS = {
+    "subject": ["maths", "statistics", "chemistry", "law", "economics", "history"],
+    "sport": ["basketball", "football", "tennis", "aikido", "badminton", "climbing", "swimming"],
+    "club": ["debate", "poetry", "chess", "film", "science", "painting"],
+}
+PREFIXES = ["", "", "hey, ", "um ", "so ", "Hi! ", "quick question: "]
+SUFFIXES = ["", "", "?", " please", " this weekend", " lol", "!!"]
+FILLER = (
+    "I just moved here and everything is a bit new. My flatmates are nice but busy. "
+    "The bus from the city centre takes forever in the morning. I have been trying "
+    "to settle in and figure out how things work around here. My parents keep "
+    "calling to ask how it is going. Anyway the weather has been grey all week. "
+).split()
+
+
+# ---------- Corpus ----------
+def utterance(topic: str, rng: random.Random) -> str:
+    text = rng.choice(PHRASES[topic])
+    for slot, values in SLOTS.items():
+        text = text.replace("{" + slot + "}", rng.choice(values))
+    text = rng.choice(PREFIXES) + text + rng.choice(SUFFIXES)
+    return text.upper() if rng.random() < 0.05 else text
+
+
+def long_message(topic: str, rng: random.Random, words: int) -> str:
+    """A rambling message with the actual request buried somewhere inside."""
+    body = [rng.choice(FILLER) for _ in range(words)]
+    body.insert(rng.randrange(len(body) + 1), utterance(topic, rng) + ".")
+    return " ".join(body)
+
+
+def synthetic_corpus(size: int, seed: int = 7, long_share: float = 0.1) -> Corpus:
+    rng = random.Random(seed)
+    topics = list(PHRASES)
+    corpus: Corpus = []
+    for _ in range(size):
+        topic = rng.choice(topics)
+        if rng.random() < long_share:
+            corpus.append((long_message(topic, rng, rng.randint(150, 600)), topic))
+        else:
+            corpus.append((utterance(topic, rng), topic))
+    return corpus
+
+
+def read_corpus(path: Path) -> Corpus:
+    with open(path, encoding="utf-8", newline="") as f:
+        return [
+            (row["text"], (row["topic"] or "").strip().lower() or NONE_LABEL)
+            for row in csv.DictReader(f)
+        ]
+
+
+def write_corpus(corpus: Corpus, path: Path) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["text", "topic"])
+        out.writerows((text, "" if topic == NONE_LABEL else topic) for text, topic in corpus)
+
+
+def corpus_digest(corpus: Corpus) -> str:
+    h = hashlib.sha256()
+    for text, topic in corpus:
+        h.update(f"{topic}\t{text}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---------- Variants ----------
+def load_script(name: str):
+    """Import one of the step scripts by path (their smoke prints are swallowed)."""
+    spec = importlib.util.spec_from_file_location(name.replace(".", "_"), ROOT / name)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def variants(model: Optional[Path]) -> Dict[str, Callable[[str], Optional[str]]]:
+    import unibot_classify as uc
+
+    out: Dict[str, Callable[[str], Optional[str]]] = {}
+    for step in (3, 4, 5):
+        out[f"step{step}.classify"] = load_script(f"Unibot_step{step}.py").classify
+    for step in (6, 7):
+        fn = load_script(f"Unibot_step{step}.py").classify_with_conf
+        out[f"step{step}.classify_with_conf"] = lambda t, fn=fn: fn(t)[0]
+    out["step8.classify_free"] = load_script("Unibot_step8.py").classify_free
+    out["unibot.classify_free"] = uc.classify_free
+    out["unibot.classify_free[cache]"] = uc.classify_free  # run with use_classify_cache()
+    if model is not None:
+        from unibot_model import load_model
+
+        m = load_model(model)
+        out["model.classify"] = lambda t: m.classify(t)[0]
+    return out
+
+
+# ---------- Measurement ----------
+def measure(fn: Callable[[str], Optional[str]], corpus: Corpus) -> Dict[str, float]:
+    clock = time.perf_counter_ns
+    times: List[int] = []
+    right = answered = answered_right = long_n = long_right = 0
+    for text, topic in corpus:
+        t0 = clock()
+        got = fn(text)
+        times.append(clock() - t0)
+        ok = (got or NONE_LABEL) == topic
+        right += ok
+        if got is not None:
+            answered += 1
+            answered_right += ok
+        if len(text) > 500:
+            long_n += 1
+            long_right += ok
+    n = len(corpus)
+    return {
+        "n": n,
+        "accuracy": right / n,
+        "none_rate": 1 - answered / n,  # no hit or a tie → None
+        "answered_accuracy": answered_right / answered if answered else 0.0,
+        "long_accuracy": long_right / long_n if long_n else 0.0,
+        "mean_us": statistics.fmean(times) / 1e3,
+        "p99_us": statistics.quantiles(times, n=100)[98] / 1e3 if n > 1 else times[0] / 1e3,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Unibot classifier benchmark")
+    ap.add_argument("--corpus", type=Path, help="CSV with text,topic columns")
+    ap.add_argument("--size", type=int, default=5000, help="synthetic corpus size")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--write-corpus", type=Path, help="save the corpus used and exit")
+    ap.add_argument("--model", type=Path, help="trained unibot_model file to include")
+    ap.add_argument("--json", type=Path, help="write results here ('-' = stdout)")
+    args = ap.parse_args(argv)
+
+    corpus = read_corpus(args.corpus) if args.corpus else synthetic_corpus(args.size, args.seed)
+    if args.write_corpus:
+        write_corpus(corpus, args.write_corpus)
+        print(f"✅ Wrote {len(corpus):,} utterances → {args.write_corpus}")
+        return
+
+    import unibot_classify as uc
+
+    results = []
+    for name, fn in variants(args.model).items():
+        uc.use_classify_cache(uc.CACHE_SIZE if name.endswith("[cache]") else None)
+        results.append({"variant": name, **measure(fn, corpus)})
+    uc.use_classify_cache(None)
+
+    report = {
+        "format": 1,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": {
+            "source": str(args.corpus) if args.corpus else f"synthetic size={args.size} seed={args.seed}",
+            "n": len(corpus),
+            "long": sum(len(t) > 500 for t, _ in corpus),
+            "sha256": corpus_digest(corpus),
+        },
+        "results": results,
+    }
+    if args.json and str(args.json) == "-":
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{'variant':<30} {'acc':>6} {'none':>6} {'ans acc':>8} {'long acc':>9} "
+        f"{'mean µs':>8} {'p99 µs':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['variant']:<30} {r['accuracy']:>6.1%} {r['none_rate']:>6.1%} "
+            f"{r['answered_accuracy']:>8.1%} {r['long_accuracy']:>9.1%} "
+            f"{r['mean_us']:>8.1f} {r['p99_us']:>8.1f}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"✅ Results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Keyword matching benchmark: per-keyword substring scans vs one Aho–Corasick pass
+# vs the whole-word TokenIndex (different semantics, so timed but not compared)
+# Usage: python bench/keywords.py [--sizes 0 500 2000 5000] [--texts 2000]
+# Vocabularies beyond the real one are padded with synthetic pseudo-words.
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from unibot_classify import TOPIC_KEYWORDS, TokenIndex, keyword_table  # noqa: E402
+
+
+# ---------- Aho–Corasick automaton ----------
+# classify_free matched through this until whole-word TokenIndex matching replaced
+# it; it is kept here only as the substring baseline the index is timed against.
+class KeywordMatcher:
+    """Multi-pattern substring matcher: cost grows with the text, not the vocabulary."""
+
+    def __init__(self, topics: Mapping[str, Iterable[str]]):
+        self.topics, self.keywords, self.keyword_topics = keyword_table(topics)
+        ids = {w: i for i, w in enumerate(self.keywords)}
+
+        # trie
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for w, i in ids.items():
+            state = 0
+            for ch in w:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (i,)
+
+        # failure links (BFS), folding each state's fail outputs into its own
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+                queue.append(nxt)
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._alphabet = frozenset(ch for w in ids for ch in w)
+
+    def keyword_ids(self, text: str) -> Set[int]:
+        """Ids of every keyword occurring in ``text`` (one pass, overlaps included)."""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            if ch not in alphabet:
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def topic_hits(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords per topic found in ``text``."""
+        hits = dict.fromkeys(self.topics, 0)
+        for i in self.keyword_ids(text):
+            for topic in self.keyword_topics[i]:
+                hits[topic] += 1
+        return hits
+
+
+def pseudo_word(rng: random.Random) -> str:
+    syllables = rng.randint(2, 4)
+    return "".join(
+        rng.choice("bcdfghjklmnpqrstvwz") + rng.choice("aeiou") for _ in range(syllables)
+    )
+
+
+def vocabulary(size: int, rng: random.Random) -> Dict[str, List[str]]:
+    topics = {t: list(ws) for t, ws in TOPIC_KEYWORDS.items()}
+    names = list(topics)
+    total = sum(map(len, topics.values()))
+    while total < size:
+        topics[names[total % len(names)]].append(pseudo_word(rng))
+        total += 1
+    return topics
+
+
+def utterances(topics: Dict[str, List[str]], n: int, rng: random.Random) -> List[str]:
+    words = [w for ws in topics.values() for w in ws]
+    filler = "i need some help with my week can you tell me about the campus".split()
+    out = []
+    for _ in range(n):
+        parts = rng.sample(filler, rng.randint(4, 10))
+        for _ in range(rng.randint(0, 2)):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(words))
+        out.append(" ".join(parts))
+    return out
+
+
+def decide(hits: Dict[str, int]) -> Optional[str]:
+    flags = {k: int(v > 0) for k, v in hits.items()}
+    if sum(flags.values()) == 0 or list(flags.values()).count(1) > 1:
+        return None
+    return max(flags, key=flags.get)
+
+
+def scan(topics: Dict[str, List[str]], t: str) -> Dict[str, int]:
+    # what classify_free did before: one substring scan per keyword
+    return {k: int(any(w in t for w in ws)) for k, ws in topics.items()}
+
+
+def timed(fn, texts: List[str]) -> float:
+    t0 = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return (time.perf_counter() - t0) / len(texts) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Unibot keyword matcher benchmark")
+    ap.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[0, 500, 2000, 5000],
+        help="total keywords per run (0 = the real vocabulary only)",
+    )
+    ap.add_argument("--texts", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'keywords':>9} {'scan µs':>9} {'automaton µs':>13} {'speedup':>8} {'tokens µs':>10}  same")
+    for size in args.sizes:
+        topics = vocabulary(size, rng)
+        texts = utterances(topics, args.texts, rng)
+        matcher = KeywordMatcher(topics)
+        index = TokenIndex(topics)
+        same = all(decide(scan(topics, t)) == decide(matcher.topic_hits(t)) for t in texts)
+        slow = timed(lambda t: scan(topics, t), texts)
+        fast = timed(matcher.topic_hits, texts)
+        words = timed(index.topic_hits, texts)
+        n = sum(map(len, topics.values()))
+        print(f"{n:>9} {slow:>9.1f} {fast:>13.1f} {slow / fast:>7.1f}x {words:>10.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
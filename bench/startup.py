@@ -0,0 +1,53 @@
+# Startup benchmark: wall time from process launch to the end of a one-turn chat
+# Usage:
+#   python bench/startup.py                    # source run: python Unibot.py
+#   python bench/startup.py --exe dist/Unibot/Unibot
+#   python bench/startup.py --bundle dist/Unibot   # also report bundle size
+# Run from a directory that contains data/unilife.csv.
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# one unclear opener, one unclear clarification, then "no" → the bot exits
+SCRIPT = "x\nx\nno\n"
+
+
+def run_once(cmd) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(
+        cmd, input=SCRIPT, text=True, stdout=subprocess.DEVNULL, check=True
+    )
+    return time.perf_counter() - t0
+
+
+def dir_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Unibot startup benchmark")
+    ap.add_argument("--exe", help="frozen Unibot executable to time")
+    ap.add_argument("--bundle", help="PyInstaller output folder to measure")
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+
+    cmd = [args.exe] if args.exe else [sys.executable, str(ROOT / "Unibot.py")]
+    run_once(cmd)  # warm the OS cache (and build the catalog snapshot)
+    times = [run_once(cmd) for _ in range(args.runs)]
+    print(f"command : {' '.join(cmd)}")
+    print(f"runs    : {args.runs}")
+    print(f"median  : {statistics.median(times) * 1000:.0f} ms")
+    print(f"min     : {min(times) * 1000:.0f} ms")
+    if args.bundle:
+        print(f"bundle  : {dir_size(Path(args.bundle)) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
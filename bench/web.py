@@ -0,0 +1,89 @@
+# Web throughput benchmark: simulated students chatting through the Gradio server
+# Usage:
+#   python bench/web.py                           # in-process server, 100 students
+#   python bench/web.py --users 500 --concurrency 16
+#   python bench/web.py --url http://127.0.0.1:7860/   # an already running unibot_web
+# Each student is its own gradio_client session (own dialog state) and plays SCRIPT
+# once; all start together. Run from a directory that contains data/unilife.csv.
+from __future__ import annotations
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from gradio_client import Client
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# sports (exploring) → study (struggling, private) → associations → close
+SCRIPT = [
+    "sports please",
+    "exploring",
+    "team",
+    "yes, study help",
+    "I am stuck",
+    "private",
+    "more social",
+    "I like poetry",
+    "no thanks",
+]
+
+
+def student(url: str, latencies: List[float], ready: threading.Barrier):
+    client = Client(url, verbose=False)
+    history: list = []
+    ready.wait()
+    for line in SCRIPT:
+        t0 = time.perf_counter()
+        _, history = client.predict(line, history, api_name="/respond")[:2]
+        latencies.append(time.perf_counter() - t0)
+
+
+def serve(catalog: str, concurrency: int, queue_size: int) -> str:
+    from unibot_catalog import CatalogWatcher, build_catalog, load_columns
+    from unibot_web import build_app
+
+    watcher = CatalogWatcher(catalog, lambda: build_catalog(load_columns(Path(catalog))))
+    app = build_app(watcher, concurrency, queue_size or None)
+    app.launch(prevent_thread_lock=True, quiet=True)
+    return app.local_url
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Unibot web throughput benchmark")
+    ap.add_argument("--url", help="running unibot_web server (default: start one here)")
+    ap.add_argument("--catalog", default="data/unilife.csv")
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--queue-size", type=int, default=0)
+    args = ap.parse_args()
+
+    url = args.url or serve(args.catalog, args.concurrency, args.queue_size)
+    latencies: List[float] = []
+    ready = threading.Barrier(args.users + 1)
+    threads = [
+        threading.Thread(target=student, args=(url, latencies, ready))
+        for _ in range(args.users)
+    ]
+    for t in threads:
+        t.start()
+    ready.wait()  # every client connected; time the conversations only
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    print(f"server  : {url}")
+    print(f"users   : {args.users} x {len(SCRIPT)} turns")
+    print(f"turns/s : {len(latencies) / wall:.0f}")
+    print(f"p50     : {statistics.median(latencies) * 1000:.0f} ms")
+    print(f"p95     : {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
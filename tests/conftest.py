@@ -0,0 +1,41 @@
+# Shared fixtures: a small in-memory catalog, no CSV needed
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from unibot_catalog import build_catalog  # noqa: E402
+
+COLUMNS = {
+    "sports": [
+        "football",
+        "basketball",
+        "tennis",
+        "table tennis",
+        "badminton",
+        "running",
+        "swimming",
+        "aikido",
+        "yoga",
+    ],
+    "associations": [
+        "Poetry Pals",
+        "Debating Society",
+        "Science Society",
+        "Painting and Pottery",
+        "Music Band",
+    ],
+    "events": [
+        "Karaoke Night (18 Apr)",
+        "Film Night (Fridays)",
+        "Hackathon (3 Mar 2027)",
+        "Open Day (date tbc)",
+    ],
+}
+
+
+@pytest.fixture(scope="session")
+def cat():
+    return build_catalog({k: list(v) for k, v in COLUMNS.items()})
@@ -0,0 +1,223 @@
+# Catalog loading: snapshots, streaming ingest, hot reload, CSV layouts, multi-file merge
+import os
+import sys
+import time
+
+import pytest
+
+import unibot_catalog
+from unibot_catalog import (
+    ENTRY_OVERHEAD,
+    CatalogBuilder,
+    CatalogWatcher,
+    build_catalog,
+    build_columns,
+    load_columns,
+    load_sources,
+    read_snapshot,
+    snapshot_path,
+    stream_columns,
+)
+
+WIDE = (
+    "sports,associations,events\n"
+    "football,Poetry Pals,Karaoke Night (18 Apr)\n"
+    "tennis,,Film Night (Fridays)\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "unilife.csv"
+    path.write_text(WIDE, encoding="utf-8")
+    return path
+
+
+def forbid(monkeypatch, name):
+    def fail(*args, **kwargs):
+        raise AssertionError(f"{name} should not run")
+
+    monkeypatch.setattr(unibot_catalog, name, fail)
+
+
+def touch(path, seconds=10):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10**9))
+
+
+def test_snapshot_is_reused_while_the_csv_is_unchanged(csv_file, monkeypatch):
+    cols = load_columns(csv_file)
+    assert snapshot_path(csv_file).exists()
+    assert cols["sports"] == ["football", "tennis"]
+    forbid(monkeypatch, "build_columns")
+    assert load_columns(csv_file) == cols
+
+
+def test_touched_csv_with_the_same_bytes_keeps_its_snapshot(csv_file, monkeypatch):
+    cols = load_columns(csv_file)
+    touch(csv_file)
+    forbid(monkeypatch, "build_columns")
+    assert load_columns(csv_file) == cols  # hash matched
+    forbid(monkeypatch, "file_digest")
+    assert read_snapshot(csv_file) == cols  # ... and the new mtime was recorded
+
+
+def test_size_change_invalidates_the_snapshot(csv_file):
+    load_columns(csv_file)
+    csv_file.write_text(WIDE + "yoga,,\n", encoding="utf-8")
+    assert read_snapshot(csv_file) is None
+    assert load_columns(csv_file)["sports"] == ["football", "tennis", "yoga"]
+
+
+def test_same_size_edit_is_caught_by_the_hash(csv_file):
+    load_columns(csv_file)
+    csv_file.write_text(WIDE.replace("football", "handball"), encoding="utf-8")
+    touch(csv_file)
+    assert read_snapshot(csv_file) is None
+    assert load_columns(csv_file)["sports"] == ["handball", "tennis"]
+
+
+def test_unreadable_snapshot_is_rebuilt(csv_file):
+    cols = load_columns(csv_file)
+    snapshot_path(csv_file).write_bytes(b"not a snapshot")
+    assert read_snapshot(csv_file) is None
+    assert load_columns(csv_file) == cols
+
+
+# ---------- Streaming ingest ----------
+def many_rows(n):
+    lines = ["kind,name,description"]
+    for i in range(n):
+        lines.append(f"association,Club {i} – Ünïcode,Meets every week ({i})")
+        lines.append(f"sport,Sport {i % 7},")
+        lines.append(f"event,Party {i} (1{i % 10} Mar),")
+    return "\n".join(lines) + "\n"
+
+
+def test_stream_matches_a_full_load(tmp_path, monkeypatch):
+    path = tmp_path / "big.csv"
+    path.write_text(many_rows(300), encoding="utf-8")
+    full = build_columns(path.read_bytes())
+    monkeypatch.setattr(unibot_catalog, "READ_BLOCK", 7)  # splits multi-byte characters
+    assert stream_columns(path, chunk_bytes=512, memory_limit=1 << 24) == full
+    assert read_snapshot(path) == full  # written in many small frames
+
+
+def test_stream_stops_at_the_memory_ceiling(tmp_path):
+    path = tmp_path / "big.csv"
+    path.write_text(many_rows(2000), encoding="utf-8")
+    with pytest.raises(MemoryError):
+        stream_columns(path, chunk_bytes=4096, memory_limit=64 << 10)
+    assert not snapshot_path(path).exists()
+    with pytest.raises(ValueError):
+        stream_columns(path, chunk_bytes=1 << 20, memory_limit=1 << 20)
+
+
+def test_memory_estimate_counts_names_and_keys():
+    builder = CatalogBuilder()
+    builder.add_records([("sports", "Football", {}), ("sports", "FOOTBALL", {})])
+    name, key = sys.getsizeof("Football"), sys.getsizeof("football")
+    assert builder.held == name + key + ENTRY_OVERHEAD  # the duplicate costs nothing
+
+
+# ---------- Hot reload ----------
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_watcher_keeps_the_old_catalog_on_a_bad_edit(csv_file):
+    errors = []
+    watcher = CatalogWatcher(
+        csv_file,
+        lambda: build_catalog(load_columns(csv_file)),
+        interval=0.01,
+        on_error=errors.append,
+    ).start()
+    try:
+        old = watcher.current()
+        csv_file.write_text("sport;association\nbroken\n", encoding="utf-8")
+        wait_for(lambda: errors)
+        assert isinstance(errors[0], ValueError)
+        assert watcher.current() is old and watcher.reloads == 0
+        csv_file.write_text(WIDE + "yoga,,\n", encoding="utf-8")  # fixed edit
+        wait_for(lambda: watcher.reloads == 1)
+        assert watcher.current().sports == ("football", "tennis", "yoga")
+        assert len(errors) == 1  # the broken version was not retried
+    finally:
+        watcher.stop()
+
+
+# ---------- Layouts ----------
+LONG = (
+    "kind,name,date,description\n"
+    "sport,Football,,\n"
+    "club,Poetry Pals,,Verse and spoken word\n"
+    "Event,Karaoke Night,18 Apr,\n"
+    "event,Film Night (Fridays),,Classics\n"
+    ",Nameless kind,,\n"
+    "society,poetry  PALS,,Second description\n"
+)
+
+
+def test_long_layout_maps_kinds_and_aligns_attributes():
+    cols = build_columns(LONG.encode("utf-8"))
+    assert cols["sports"] == ["Football"]
+    assert cols["associations"] == ["Poetry Pals"]  # case/space duplicate merged
+    assert cols["associations.description"] == ["Verse and spoken word"]
+    assert cols["events"] == ["Karaoke Night (18 Apr)", "Film Night (Fridays)"]
+    assert cols["events.date"] == ["18 Apr", ""]
+    assert cols["events.description"] == ["", "Classics"]
+
+
+def test_wide_layout_skips_padding_cells():
+    cols = build_columns(b"sports,associations,events\nyoga,,\n,Music Band,\n")
+    assert cols == {"sports": ["yoga"], "associations": ["Music Band"], "events": []}
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError, match="missing"):
+        build_columns(b"sport,club\nyoga,Music Band\n")
+
+
+# ---------- Multi-file catalogs ----------
+@pytest.fixture
+def campuses(tmp_path):
+    for campus, sport, club in (
+        ("campus-a", "Football", "Poetry Pals"),
+        ("campus-b", "Rowing", "poetry pals"),
+    ):
+        folder = tmp_path / campus
+        folder.mkdir()
+        (folder / "2025-fall.csv").write_text(
+            f"kind,name\nsport,{sport}\nclub,{club}\n", encoding="utf-8"
+        )
+    return tmp_path
+
+
+def test_sources_merge_with_their_origin(campuses):
+    for source in (campuses, f"{campuses}/*/*.csv"):
+        cols = load_sources(source, workers=1)
+        assert cols["sports"] == ["Football", "Rowing"]
+        assert cols["sports.source"] == ["campus-a/2025-fall", "campus-b/2025-fall"]
+        assert cols["associations"] == ["Poetry Pals"]
+        assert cols["associations.source"] == ["campus-a/2025-fall;campus-b/2025-fall"]
+
+
+def test_sources_stream_only_the_files_past_the_threshold(campuses, monkeypatch):
+    big = campuses / "campus-b" / "2025-fall.csv"
+    big.write_text(big.read_text(encoding="utf-8") + "sport,Sailing\n", encoding="utf-8")
+    streamed = []
+    real = unibot_catalog.stream_columns
+    monkeypatch.setattr(
+        unibot_catalog,
+        "stream_columns",
+        lambda path, *args: streamed.append(path.parent.name) or real(path, *args),
+    )
+    monkeypatch.setattr(unibot_catalog, "STREAM_THRESHOLD", big.stat().st_size - 1)
+    load_sources(campuses, workers=1)
+    assert streamed == ["campus-b"]
+    load_sources(campuses, workers=1, stream=False)
+    assert streamed == ["campus-b"]
@@ -0,0 +1,127 @@
+# Topic classification: whole-word keyword matching, bulk labelling, answer cache
+import csv
+import random
+
+import pytest
+
+import unibot_classify
+from unibot_classify import (
+    TOPIC_INDEX,
+    LRUCache,
+    classify_free,
+    classify_many,
+    label_file,
+    set_topic_keywords,
+    use_classify_cache,
+)
+
+WORDS = [
+    "exam", "exams", "library", "scheduling", "football", "running", "table tennis",
+    "table-tennis", "TABLE  tennis", "parties", "club", "meet-up", "brunch", "shower",
+    "tables", "the", "a", "I", "need", "help", "with", "my", "tonight", "!", "?", ",",
+    "…", "Ünï", "\0",
+]
+
+
+def utterances(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 8))) for _ in range(n)
+    ]
+
+
+def test_classify_free_needs_exactly_one_topic():
+    assert classify_free("I have an exam tomorrow") == "studying"
+    assert classify_free("where can I play football") == "sports"
+    assert classify_free("is there a party tonight") == "social"
+    assert classify_free("exam then football") is None
+    assert classify_free("hello there") is None
+
+
+def test_classify_free_matches_whole_words():
+    assert classify_free("sunday brunch") != "sports"  # no "run" inside "brunch"
+    assert classify_free("after my shower") is None  # nor "show" inside "shower"
+    assert classify_free("any shows on?") == "social"
+    assert classify_free("I love table-tennis") == "sports"
+    assert classify_free("parties!") == "social"
+    assert classify_free("I keep running late") == "sports"
+
+
+def test_classify_many_matches_classify_free():
+    texts = utterances(3000)
+    rows = classify_many(texts, chunk_size=97)
+    assert len(rows) == len(texts)
+    for text, (topic, confidence, hits) in zip(texts, rows):
+        assert topic == classify_free(text), text
+        assert hits == TOPIC_INDEX.topic_hits(text), text
+        assert confidence == (min(1.0, hits[topic] / 3.0) if topic else 0.0)
+
+
+def test_classify_many_treats_non_text_as_empty():
+    assert [r[0] for r in classify_many(["exam", None, 3.5, "football"])] == [
+        "studying", None, None, "sports"
+    ]
+
+
+def test_label_file_writes_one_row_per_line(tmp_path):
+    texts = [t.replace("\0", " ") for t in utterances(500, seed=1)]
+    src, dst = tmp_path / "log.txt", tmp_path / "labelled.csv"
+    src.write_text("\n".join(texts) + "\n", encoding="utf-8")
+    assert label_file(src, dst, chunk_size=64) == len(texts)
+    with open(dst, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["text"] for r in rows] == texts
+    assert [r["topic"] or None for r in rows] == [classify_free(t) for t in texts]
+    assert rows[0].keys() >= {"confidence", "hits_studying", "hits_sports", "hits_social"}
+
+
+def test_classify_many_on_a_series_returns_a_frame():
+    pd = pytest.importorskip("pandas")
+    texts = utterances(200, seed=2) + [None]
+    series = pd.Series(texts, index=[f"u{i}" for i in range(len(texts))])
+    frame = classify_many(series, chunk_size=50)
+    assert list(frame.index) == list(series.index)
+    hits = [f"hits_{topic}" for topic in ("studying", "sports", "social")]
+    assert list(frame.columns) == ["topic", "confidence", *hits]
+    expected = [classify_free(t) if t else None for t in texts]
+    assert [t if isinstance(t, str) else None for t in frame["topic"]] == expected
+
+
+# ---------- Answer cache and keyword config ----------
+@pytest.fixture
+def restore_config():
+    before = unibot_classify.TOPIC_KEYWORDS
+    yield
+    set_topic_keywords(before)
+    use_classify_cache(None)
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = LRUCache(2)
+    assert cache.get("a", lambda: 1) == 1
+    assert cache.get("b", lambda: 2) == 2
+    assert cache.get("a", lambda: "recomputed") == 1  # a is now the most recent
+    cache.get("c", lambda: 3)  # evicts b
+    assert cache.get("b", lambda: "recomputed") == "recomputed"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 4, 2, 2)
+
+
+def test_cache_is_opt_in(restore_config):
+    assert unibot_classify.CLASSIFY_CACHE is None
+    cache = use_classify_cache(8)
+    classify_free("Sports!")
+    classify_free(" sports")  # same tokens, same entry
+    assert (cache.stats().hits, cache.stats().misses) == (1, 1)
+    assert use_classify_cache(None) is None
+
+
+def test_new_keywords_drop_cached_answers(restore_config):
+    cache = use_classify_cache(8)
+    old = unibot_classify.TOPIC_KEYWORDS
+    assert classify_free("quidditch practice") is None
+    set_topic_keywords({**old, "sports": (*old["sports"], "quidditch")})
+    assert cache.stats().size == 0
+    assert classify_free("quidditch practice") == "sports"
+    assert "quidditch" not in old["sports"]  # swapped, not edited under readers
+    assert "quidditch" in unibot_classify.TOPIC_KEYWORDS["sports"]
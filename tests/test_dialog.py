@@ -0,0 +1,140 @@
+# Transcripts through the dialog state machine, one per branch of the old run_once
+from unibot_dialog import (
+    ASK_ASSOC_PREF,
+    ASK_CONTINUE,
+    ASK_MORE,
+    ASK_SOCIAL,
+    ASK_SPORT,
+    ASK_SPORT_NAME,
+    ASK_SPORT_PREF,
+    ASK_STUDY_NEED,
+    ASK_STUDY_SHARE,
+    ASK_TOPIC_AGAIN,
+    GREETING,
+    Session,
+    start,
+    turn,
+)
+
+
+def chat(cat, *answers):
+    """Messages of each turn, starting with the greeting, and the last session."""
+    session, messages = start()
+    transcript = [messages]
+    for text in answers:
+        session, messages = turn(cat, session, text)
+        transcript.append(messages)
+    return transcript, session
+
+
+def test_start_greets_and_waits_for_a_topic():
+    session, messages = start()
+    assert messages == [GREETING]
+    assert session == Session("topic") and not session.closed
+
+
+def test_studying_practical_goes_to_student_desk(cat):
+    t, s = chat(cat, "I have a question about my exam", "where is the library")
+    assert t[1] == [ASK_STUDY_NEED]
+    assert "Student Desk" in t[2][0] and t[2][-1] == ASK_MORE
+    assert s.step == "more"
+
+
+def test_studying_struggle_shared_or_private(cat):
+    t, _ = chat(cat, "exam stress", "I am stuck", "happy to share with a group")
+    assert t[2] == [ASK_STUDY_SHARE]
+    assert "study group" in t[3][0]
+    t, _ = chat(cat, "exam stress", "I am stuck", "keep it to myself")
+    assert "student advisor" in t[3][0]
+
+
+def test_sports_named_sport_is_available(cat):
+    t, s = chat(cat, "sports please", "I play badminton")
+    assert t[1] == [ASK_SPORT]
+    assert "That sport is available" in t[2][0] and t[2][-1] == ASK_MORE
+
+
+def test_sports_misspelled_sport_is_named_back(cat):
+    t, _ = chat(cat, "sports please", "tabel tennis")
+    assert "(Table Tennis, I think)" in t[2][0]
+
+
+def test_sports_yes_then_unknown_sport_falls_back_to_recommendation(cat):
+    t, s = chat(cat, "sports please", "yes", "curling", "cardio")
+    assert t[2] == [ASK_SPORT_NAME]
+    assert t[3] == [" I couldn’t find that exact sport on the campus list.", ASK_SPORT_PREF]
+    assert t[4] == [
+        "Recommendation: Running (brief: exploring → follow-up → recommend from available list)",
+        ASK_MORE,
+    ]
+    assert s.step == "more"
+
+
+def test_sports_exploring_recommends_once(cat):
+    # the old sports_flow asked both questions a second time after recommending
+    t, s = chat(cat, "sports please", "just exploring", "team vibes")
+    assert t[2] == [ASK_SPORT_PREF]
+    assert t[3][0].startswith("Recommendation: Football") and t[3][-1] == ASK_MORE
+    assert s.step == "more"
+
+
+def test_social_association_path(cat):
+    t, _ = chat(cat, "looking for a party", "joining an association", "I like poetry")
+    assert t[1] == [ASK_SOCIAL]
+    assert t[2] == [ASK_ASSOC_PREF]
+    assert t[3][0].startswith("➡️ Try joining: Poetry Pals")
+
+
+def test_social_event_path_lists_three_soonest(cat):
+    t, _ = chat(cat, "looking for a party", "any parties or concerts?")
+    assert t[2][0] == "🎉 The three soonest campus events:"
+    assert t[2][1:4] == [f" • {e}" for e in cat.soonest_events(3)]
+    assert t[2][-1] == ASK_MORE
+
+
+def test_social_time_phrase_about_a_club_is_not_an_event_question(cat):
+    t, _ = chat(cat, "looking for a party", "I want to join a club this year")
+    assert t[2] == [ASK_ASSOC_PREF]
+
+
+def test_social_a_week_or_a_day_alone_is_not_a_date_range(cat):
+    for text in ("something I can do once a week", "I have a day off, anything fun?"):
+        t, _ = chat(cat, "looking for a party", text)
+        assert t[2] == [ASK_ASSOC_PREF], text
+
+
+def test_unclear_topic_twice(cat):
+    t, s = chat(cat, "hmm", "dunno")
+    assert t[1] == [ASK_TOPIC_AGAIN]
+    assert t[2] == [
+        "I couldn’t confidently infer the topic from free text this time.",
+        ASK_MORE,
+    ]
+    assert s.step == "more"
+
+
+def test_more_with_remainder_continues_with_it(cat):
+    t, s = chat(cat, "exam", "where is the library", "yes, sports please")
+    assert t[3] == ["Cool — continuing with that.", ASK_SPORT]
+    assert s.step == "sport"
+
+
+def test_more_without_remainder_greets_again(cat):
+    t, s = chat(cat, "exam", "where is the library", "yes")
+    assert t[3] == ["Cool — tell me what you need next.", GREETING]
+    assert s.step == "topic"
+
+
+def test_unclear_more_then_continue_or_end(cat):
+    t, s = chat(cat, "exam", "where is the library", "hmm", "yes")
+    assert t[3] == [ASK_CONTINUE]
+    assert t[4] == [GREETING] and s.step == "topic"
+    t, s = chat(cat, "exam", "where is the library", "hmm", "whatever")
+    assert t[4] == ["All good. Ending here — take care! "] and s.closed
+
+
+def test_no_closes_and_closed_ignores_input(cat):
+    t, s = chat(cat, "exam", "where is the library", "no thanks")
+    assert t[3] == ["Got you. Closing the chat — have a solid day! "]
+    assert s.closed
+    assert turn(cat, s, "hello?") == (s, [])
@@ -0,0 +1,26 @@
+# Event-label date parsing
+from unibot_events import extract_event_dates, parse_event_date
+
+
+def test_parse_event_date_forms():
+    assert parse_event_date("Gala (13-15 March)")[1:5] == (3, 13, 3, 15)
+    assert parse_event_date("Gala (Fri 13 Jan 2027)").year == 2027
+    assert parse_event_date("Pub quiz (Thursdays)").weekday == 3
+    assert parse_event_date("no date here") is None
+
+
+def test_weekly_needs_a_full_day_name_or_a_day_in_parentheses():
+    assert parse_event_date("Quiz every Thursday").weekday == 3
+    assert parse_event_date("Yoga (Mon)").weekday == 0
+    for label in ("SAT Prep Workshop", "Sun Salutation Yoga", "Mon Repos Dinner"):
+        assert parse_event_date(label) is None, label
+    assert parse_event_date("Fri-Yay Social") is None
+    assert parse_event_date("Fri-Yay Social (13 Jan)")[1:3] == (1, 13)
+
+
+def test_bulk_extraction_agrees_on_weekly_labels():
+    labels = [
+        "Gala (13-15 March)", "SAT Prep (Sat)", "Sun Salutation Yoga", "Dec 18 party",
+        "Quiz (Thursdays) and (3 Mar)", "x\0(1 Jan)", "", "Mon Repos (Sundays)",
+    ]
+    assert extract_event_dates(labels) == [parse_event_date(label) for label in labels]
@@ -0,0 +1,201 @@
+# EventTable: soonest events, date windows and time phrases, against a fixed clock
+import random
+from datetime import date, timedelta
+
+from unibot_events import build_events, occurrence, parse_event_date, parse_time_phrase
+
+FRIDAY = date(2026, 10, 16)
+LABELS = [
+    "New Year's Party (13 Jan)",
+    "Halloween Bash (31 Oct)",
+    "Film Night (Fridays)",
+    "Hackathon (3 Mar 2027)",
+    "Alumni Day (1 Jan 2020)",
+    "Winter Fair (30 Dec – 2 Jan)",
+    "Open Day (date tbc)",
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+DAYS = ["Mondays", "Tuesday", "Wednesdays", "Thursday", "Friday", "Saturdays", "Sunday"]
+
+
+def random_labels(n, seed):
+    """Yearly, one-off, multi-day, weekly, 29 Feb and undated labels."""
+    rnd = random.Random(seed)
+    labels = []
+    for i in range(n):
+        day, month = rnd.randint(1, 28), rnd.choice(MONTHS)
+        form = rnd.choice(["yearly", "yearly", "once", "range", "weekly", "leap", "tbc"])
+        when = {
+            "yearly": f"{day} {month}",
+            "once": f"{day} {month} {rnd.randint(2024, 2029)}",
+            "range": f"{day} {month} – {rnd.randint(1, 28)} {rnd.choice(MONTHS)}",
+            "weekly": rnd.choice(DAYS),
+            "leap": "29 Feb",
+            "tbc": "date tbc",
+        }[form]
+        labels.append(f"E{i} ({when})")
+    return labels
+
+
+def test_upcoming_orders_by_next_occurrence():
+    table = build_events(LABELS, FRIDAY)
+    assert [label for label, _ in table.upcoming(4, FRIDAY)] == [
+        "Film Night (Fridays)",
+        "Halloween Bash (31 Oct)",
+        "Winter Fair (30 Dec – 2 Jan)",
+        "New Year's Party (13 Jan)",
+    ]
+
+
+def test_upcoming_wraps_yearly_events_and_skips_past_one_offs():
+    table = build_events(LABELS, FRIDAY)
+    later = date(2027, 2, 1)  # New Year's Party is over; it comes back next January
+    found = dict(table.upcoming(10, later))
+    assert found["Hackathon (3 Mar 2027)"] == date(2027, 3, 3)
+    assert found["New Year's Party (13 Jan)"] == date(2028, 1, 13)
+    assert found["Film Night (Fridays)"] == date(2027, 2, 5)
+    assert "Alumni Day (1 Jan 2020)" not in found
+
+
+def test_upcoming_pads_with_undated_events():
+    table = build_events(["Open Day (date tbc)", "Quiz (Mondays)"], FRIDAY)
+    assert table.upcoming(3, FRIDAY) == [
+        ("Quiz (Mondays)", date(2026, 10, 19)),
+        ("Open Day (date tbc)", None),
+    ]
+
+
+def test_upcoming_walk_agrees_with_heap_selection():
+    for seed in range(20):
+        today = date(2023, 1, 1) + timedelta(days=random.Random(seed).randint(0, 2000))
+        table = build_events(random_labels(60, seed), today)
+        for offset in (0, 1, 59, 200, 364):
+            n = (today + timedelta(days=offset)).toordinal()
+            expected = sorted(table._occurrences(n))[:12]
+            assert table.upcoming(12, date.fromordinal(n))[: len(expected)] == [
+                (table.labels[i], date.fromordinal(start)) for start, _, i in expected
+            ], (seed, offset)
+
+
+def brute_upcoming(labels, k, now):
+    """Each label's next occurrence not over at ``now``, tried year by year."""
+    found, undated = [], []
+    for pos, label in enumerate(labels):
+        spec = parse_event_date(label)
+        if spec is None:
+            undated.append(label)
+            continue
+        if spec.month == 0:
+            start = now + timedelta(days=(spec.weekday - now.weekday()) % 7)
+            found.append((start, pos, label))
+            continue
+        years = [spec.year] if spec.year else range(now.year - 1, now.year + 9)
+        spans = [occurrence(spec, year) for year in years]
+        span = next((s for s in spans if s is not None and s[1] >= now), None)
+        if span is not None:
+            found.append((span[0], pos, label))
+        elif not any(spans):
+            undated.append(label)
+    dated = [(label, start) for start, _, label in sorted(found)[:k]]
+    return dated + [(label, None) for label in undated[: k - len(dated)]]
+
+
+def test_upcoming_agrees_with_a_year_by_year_scan():
+    for seed in range(30):
+        rnd = random.Random(seed)
+        today = date(2023, 1, 1) + timedelta(days=rnd.randint(0, 2000))
+        labels = random_labels(60, seed)
+        table = build_events(labels, today)
+        for offset in (0, 1, 200, 364, 365, 900, 2000):  # the cursor walk, then the heap
+            now = today + timedelta(days=offset)
+            assert table.upcoming(12, now) == brute_upcoming(labels, 12, now), (seed, now)
+
+
+def test_upcoming_counts_the_leap_day_in_a_running_event():
+    table = build_events(["Long Run (8 Oct – 22 Jul)"], FRIDAY)
+    for now in (date(2024, 7, 22), date(2028, 7, 22)):  # last day of a span over 29 Feb
+        assert table.upcoming(1, now) == [("Long Run (8 Oct – 22 Jul)", date(now.year - 1, 10, 8))]
+
+
+def test_between_includes_running_and_weekly_events():
+    table = build_events(LABELS, FRIDAY)
+    new_year = [label for label, _ in table.between(date(2027, 1, 1), date(2027, 1, 3))]
+    assert new_year == ["Winter Fair (30 Dec – 2 Jan)", "Film Night (Fridays)"]
+
+
+def brute_between(labels, first, last):
+    """Every label's first occurrence overlapping [first, last], tried year by year."""
+    found = []
+    for pos, label in enumerate(labels):
+        spec = parse_event_date(label)
+        if spec is None:
+            continue
+        if spec.month == 0:
+            start = first + timedelta(days=(spec.weekday - first.weekday()) % 7)
+            if start <= last:
+                found.append((start, pos, label))
+            continue
+        for year in [spec.year] if spec.year else range(first.year - 1, last.year + 1):
+            span = occurrence(spec, year)
+            if span is not None and span[0] <= last and span[1] >= first:
+                found.append((span[0], pos, label))
+                break
+    return [(label, start) for start, _, label in sorted(found)]
+
+
+def test_between_agrees_with_a_year_by_year_scan():
+    for seed in range(60):
+        rnd = random.Random(seed)
+        today = date(2023, 1, 1) + timedelta(days=rnd.randint(0, 2000))
+        if seed % 3 == 0:
+            today = rnd.choice([date(2024, 2, 29), date(2025, 3, 1)])  # around a leap day
+        labels = random_labels(40, seed)
+        table = build_events(labels, today)
+        for _ in range(10):
+            first = today + timedelta(days=rnd.randint(-1200, 1200))
+            if rnd.random() < 0.2:
+                first = date(rnd.choice([2024, 2028]), 2, 29)
+            last = first + timedelta(days=rnd.choice([0, 1, 6, 30, 200, 400, 800]))
+            assert table.between(first, last) == brute_between(labels, first, last), (
+                seed, today, first, last
+            )
+
+
+def test_between_lists_a_yearly_event_once():
+    table = build_events(LABELS, FRIDAY)
+    found = table.between(FRIDAY, date(2028, 12, 31))
+    assert len(found) == len({label for label, _ in found})
+    assert ("Halloween Bash (31 Oct)", date(2026, 10, 31)) in found
+
+
+def test_time_phrases():
+    assert parse_time_phrase("anything this weekend", FRIDAY)[:2] == (
+        date(2026, 10, 17),
+        date(2026, 10, 18),
+    )
+    assert parse_time_phrase("events in march", FRIDAY)[:2] == (
+        date(2027, 3, 1),
+        date(2027, 3, 31),
+    )
+    assert parse_time_phrase("what's on", FRIDAY) is None
+
+
+def test_time_phrase_skips_a_limit_that_names_no_day():
+    window = parse_time_phrase("by the way any events this weekend", FRIDAY)
+    assert window.label == "this weekend"
+
+
+def test_time_phrase_relative_limits():
+    assert parse_time_phrase("events until tomorrow", FRIDAY)[:2] == (
+        FRIDAY,
+        date(2026, 10, 17),
+    )
+    # "next friday" asked on a Friday is a week away, not today
+    assert parse_time_phrase("events till next friday", FRIDAY).last == date(2026, 10, 23)
+
+
+def test_a_or_an_alone_is_not_a_window():
+    assert parse_time_phrase("something I can do once a week", FRIDAY) is None
+    assert parse_time_phrase("I have a day off", FRIDAY) is None
+    assert parse_time_phrase("anything on in a week?", FRIDAY)[:2] == (FRIDAY, date(2026, 10, 23))
+    assert parse_time_phrase("the next two weeks", FRIDAY).last == date(2026, 10, 30)
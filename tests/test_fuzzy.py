@@ -0,0 +1,86 @@
+# Fuzzy name lookups: trigram search over associations, misspelled sport names
+import random
+
+from unibot_fuzzy import (
+    MIN_SIMILARITY,
+    closest_name,
+    deletion_index,
+    nearest,
+    similarity,
+    top,
+    trigram_index,
+    trigrams,
+)
+
+WORDS = (
+    "poetry debating music band film chess robotics hiking drama choir coding salsa"
+    " baking photography gaming society club pals circle"
+).split()
+
+
+def test_trigram_search_finds_names_and_word_forms():
+    index = trigram_index(["Debating Society", "Poetry Pals", "Music Band"])
+    assert index.search("debate", 1)[0][0] == "Debating Society"
+    assert index.search("poetri pals", 1)[0][0] == "Poetry Pals"
+    assert index.search("zzzz") == []
+
+
+def test_trigram_search_matches_a_full_scan():
+    rnd = random.Random(0)
+    names = [" ".join(rnd.sample(WORDS, rnd.randint(1, 3))).title() for _ in range(300)]
+    descriptions = [" ".join(rnd.choices(WORDS, k=rnd.randint(0, 6))) for _ in names]
+    index = trigram_index(names, descriptions)
+    for _ in range(300):
+        text = " ".join(rnd.sample(WORDS, rnd.randint(1, 2)))
+        text = "".join(c for c in text if rnd.random() > 0.1)  # drop a few letters
+        for min_score in (MIN_SIMILARITY, 0.3, 0.8):
+            query = trigrams(text)
+            scored = [
+                (i, similarity(query, index.name_grams[i], index.desc_grams[i]))
+                for i in range(len(names))
+            ]
+            expected = [(names[i], s) for i, s in top(scored, 5, min_score)]
+            assert index.search(text, 5, min_score) == expected, (text, min_score)
+
+
+# ---------- Misspelled sport names ----------
+NAMES = ["badminton", "running", "swimming", "table tennis", "tennis", "yoga"]
+SPORTS = deletion_index(NAMES)
+
+
+def sport(text):
+    return closest_name(text.split(), 2, SPORTS.lookup)
+
+
+def test_misspelled_sports_resolve_with_their_edit_count():
+    assert sport("i play badmington") == ("badminton", 1)
+    assert sport("tabel tennis please") == ("table tennis", 1)
+    assert sport("tennis") == ("tennis", 0)
+
+
+def test_ordinary_words_are_not_sports():
+    assert sport("a cunning plan") is None
+    assert sport("swinging") is None
+    assert sport("yogi") is None  # short names need an exact match
+
+
+def test_deletion_lookup_matches_a_full_scan():
+    rnd = random.Random(0)
+    names = NAMES + ["basketball", "football", "ultimate frisbee", "rowing", "ice hockey"]
+    index = deletion_index(names)
+    letters = "abcdefghijklmnopqrstuvwxyz "
+    for _ in range(3000):
+        word = list(rnd.choice(names))
+        for _ in range(rnd.randint(0, 3)):
+            i = rnd.randrange(len(word) + 1)
+            op = rnd.randrange(4)
+            if op == 0 and i < len(word):
+                del word[i]
+            elif op == 1 and i < len(word):
+                word[i] = rnd.choice(letters)
+            elif op == 2:
+                word.insert(i, rnd.choice(letters))
+            elif i + 1 < len(word):
+                word[i], word[i + 1] = word[i + 1], word[i]
+        word = "".join(word)
+        assert index.lookup(word) == nearest(word, names), word
@@ -0,0 +1,25 @@
+# KeywordIndex: vibe/energy keyword picks over event labels
+import random
+
+from unibot_events import keyword_index
+
+VOCAB = ["chill", "party", "quiz", "yoga", "film", "night"]
+
+
+def test_first_keeps_label_order_and_lists_each_label_once():
+    labels = ["Film Night (Fridays)", "Chill Yoga", "Quiz NIGHT", "Karaoke", "yoga film"]
+    index = keyword_index(labels, VOCAB)
+    assert index.first(10, ["night", "film"]) == [labels[0], labels[2], labels[4]]
+    assert index.first(2, ["yoga", "chill", "yoga"]) == [labels[1], labels[4]]
+    assert index.first(3, ["karaoke"]) == []  # outside the vocabulary
+
+
+def test_postings_match_a_substring_scan():
+    rnd = random.Random(0)
+    pieces = VOCAB + ["Party", "nigh", "t", " ", "qu", "iz", "—"]
+    labels = ["".join(rnd.choices(pieces, k=rnd.randint(0, 5))) for _ in range(500)]
+    index = keyword_index(labels, VOCAB)
+    for word in VOCAB:  # a keyword never matches across two labels
+        assert index.postings[word] == tuple(
+            i for i, label in enumerate(labels) if word in label.lower()
+        ), word
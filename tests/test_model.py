@@ -0,0 +1,72 @@
+# Naive Bayes topic model: training, the memory-mapped model file
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from unibot_model import load_model, save_model, train  # noqa: E402
+
+PHRASES = {
+    "studying": ["my exam is tomorrow", "where is the library", "assignment deadline help"],
+    "sports": ["can I play football", "is the gym open", "tennis court booking"],
+    "social": ["any party tonight", "join a music society", "karaoke with friends"],
+    "none": ["hello there", "ok thanks", "what time is it"],
+}
+FILLER = ["please", "today", "hey", "so", "um", "really"]
+
+
+def corpus(n=600, seed=0):
+    rnd = random.Random(seed)
+    texts, labels = [], []
+    for _ in range(n):
+        label = rnd.choice(list(PHRASES))
+        texts.append(f"{rnd.choice(FILLER)} {rnd.choice(PHRASES[label])} {rnd.choice(FILLER)}")
+        labels.append(label)
+    return texts, labels
+
+
+@pytest.fixture(scope="module")
+def trained():
+    texts, labels = corpus()
+    model, report = train(texts, labels, buckets=1 << 12)
+    return model, report
+
+
+def test_training_reports_a_held_out_score(trained):
+    model, report = trained
+    assert report["n"] == 120 and report["accuracy"] > 0.9
+    assert report["temperature"] == model.temperature > 0
+
+
+def test_model_file_round_trips_through_a_memory_map(trained, tmp_path):
+    model, _ = trained
+    path = tmp_path / "topic.nbm"
+    save_model(model, path)
+    loaded = load_model(path)
+    assert isinstance(loaded.weights, np.memmap)
+    assert (loaded.labels, loaded.ngram, loaded.temperature, loaded.buckets) == (
+        model.labels,
+        model.ngram,
+        model.temperature,
+        model.buckets,
+    )
+    texts = ["my exam is tomorrow", "is the gym open", "any party", "ok thanks", "zzz"]
+    assert np.array_equal(loaded.weights, model.weights)
+    assert np.allclose(loaded.predict_proba(texts), model.predict_proba(texts))
+    assert [loaded.classify(t) for t in texts] == [model.classify(t) for t in texts]
+    assert loaded.classify_many(texts) == model.classify_many(texts)
+
+
+def test_classify_keeps_the_keyword_contract(trained):
+    model, _ = trained
+    assert model.classify("when is the exam")[0] == "studying"
+    assert model.classify("ok thanks")[0] is None  # learned "no topic"
+    assert model.classify("qwerty zxcv") == (None, 0.0, {"studying": 0, "sports": 0, "social": 0})
+
+
+def test_load_rejects_foreign_files(tmp_path):
+    path = tmp_path / "not-a-model.nbm"
+    path.write_bytes(b"PK\x03\x04 something else entirely")
+    with pytest.raises(ValueError, match="not a Unibot topic model"):
+        load_model(path)
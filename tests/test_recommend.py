@@ -0,0 +1,91 @@
+# Recommenders: association × feature and sport × attribute ranking
+import random
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from unibot_recommend import (  # noqa: E402
+    CUES,
+    build_recommender,
+    build_sport_recommender,
+    load_sport_attributes,
+    recommend_sports,
+)
+
+SPORT_TABLE = load_sport_attributes(Path(__file__).parents[1] / "Data" / "sport_attributes.csv")
+
+CLUBS = ["Poetry Pals", "Debate Club", "Music Band", "Chess Circle", "Yoga Society", "Film Buffs"]
+CLUB_DATA = {
+    "description": [
+        "Verse and spoken word",
+        "Argue about politics",
+        "Jam every week",
+        "Strategy games",
+        "Calm meditation",
+        "Movie nights with live music",
+    ],
+    "source": ["music"] * len(CLUBS),  # bookkeeping, never a cue
+}
+
+
+@pytest.fixture(scope="module")
+def clubs():
+    return build_recommender(CLUBS, CLUB_DATA)
+
+
+def test_a_cue_in_the_name_outranks_one_in_the_description(clubs):
+    music = clubs.top("any music?")
+    assert [name for name, _ in music] == ["Music Band", "Film Buffs"]
+    assert music[0][1] > music[1][1] > 0
+    assert clubs.top("I like poems")[0][0] == "Poetry Pals"  # word forms count
+    assert clubs.top("something else entirely") == []
+
+
+def test_profile_answers_rank_without_free_text(clubs):
+    assert [name for name, _ in clubs.top("", {"vibe": "debate"})] == ["Debate Club"]
+    assert clubs.top("", {"vibe": "chill"})[0][0] == "Yoga Society"
+    assert clubs.top("", {"vibe": "poetry"})[0][0] == "Poetry Pals"  # typed, not picked
+
+
+def test_top_matches_sorting_every_score():
+    rnd = random.Random(0)
+    cues = sorted(CUES)
+    names = [" ".join(rnd.sample(cues, rnd.randint(0, 2))) for _ in range(400)]
+    rec = build_recommender(names, {"description": [rnd.choice(cues) for _ in names]})
+    for _ in range(50):
+        text = " ".join(rnd.sample(cues, rnd.randint(1, 3)))
+        scores = rec.scores(text)
+        hits = [i for i in range(len(names)) if scores[i] > 0]
+        order = sorted(hits, key=lambda i: -scores[i])  # stable: ties keep catalog order
+        for n in (1, 3, 10):
+            assert rec.top(text, n=n) == [(names[i], float(scores[i])) for i in order[:n]]
+
+
+def test_sport_preference_matches_word_forms():
+    rec = build_sport_recommender(["Badminton", "Football", "Running"], SPORT_TABLE)
+    assert recommend_sports(rec, "teams", "", "", "") == ["Football"]
+    assert recommend_sports(rec, "I like rackets", "", "", "") == ["Badminton"]
+    assert recommend_sports(rec, "something with a ball", "", "", "") == ["Football"]
+
+
+def test_sport_answers_are_weighed():
+    rec = build_sport_recommender(sorted(SPORT_TABLE), SPORT_TABLE)
+    # the preference counts most: indoor racket sports still beat football outdoors
+    assert [s for s, _ in rec.top("racket", "", "outdoor", "")] == [
+        "tennis", "badminton", "table tennis"
+    ]
+    assert rec.top("", "low", "indoor", "solo")[0] == ("table tennis", 4.5)
+    assert [s for s, _ in rec.top("", "", "", "with friends")] == [
+        "badminton", "basketball", "football"
+    ]
+
+
+def test_sport_fallbacks():
+    rec = build_sport_recommender(["Quidditch", "Football"], SPORT_TABLE)
+    assert rec.matrix[0].sum() == 0  # not in the table: never ranked
+    assert recommend_sports(rec, "nothing I know", "", "", "") == ["Quidditch"]
+    assert recommend_sports(build_sport_recommender([], SPORT_TABLE), "", "", "", "") == [
+        "Basketball"
+    ]
@@ -0,0 +1,154 @@
+# SQLite catalog store: same answers as the in-memory Catalog, connections, reloads
+import random
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from unibot_catalog import CatalogWatcher, build_catalog, load_columns
+from unibot_events import build_events
+from unibot_store import CatalogStore, import_catalog, open_store
+
+from test_event_table import random_labels
+
+
+def make_store(tmp_path, columns):
+    return CatalogStore(import_catalog(tmp_path / "catalog.db", columns))
+
+
+@pytest.fixture
+def tied(tmp_path):
+    labels = [f"E{i} (date tbc)" for i in range(10)]
+    labels[5], labels[9] = "E5 (17 May)", "E9 (Mondays)"
+    columns = {"sports": [], "associations": [], "events": labels}
+    return labels, build_catalog(columns), make_store(tmp_path, columns)
+
+
+def test_same_day_events_keep_catalog_order(tied):
+    labels, cat, store = tied
+    friday, monday = date(2027, 5, 14), date(2027, 5, 17)
+    assert cat.soonest_events(1, friday) == store.soonest_events(1, friday) == [labels[5]]
+    for today in (date(2026, 6, 1), date(2027, 5, 1), friday):
+        table = build_events(labels, today)
+        assert [label for label, _ in table.upcoming(2, friday)] == [labels[5], labels[9]]
+    assert cat.events_between(monday, monday) == [labels[5], labels[9]]
+    assert store.events_between(monday, monday) == [labels[5], labels[9]]
+
+
+def test_undated_events_pad_in_catalog_order(tied):
+    labels, cat, store = tied
+    friday = date(2027, 5, 14)
+    expected = [labels[5], labels[9], labels[0], labels[1]]
+    assert cat.soonest_events(4, friday) == store.soonest_events(4, friday) == expected
+
+
+def test_running_event_over_a_leap_day(tmp_path):
+    labels = ["Long Run (8 Oct – 22 Jul)", "Later (1 Aug)"]
+    store = make_store(tmp_path, {"sports": [], "associations": [], "events": labels})
+    last_day = date(2024, 7, 22)  # 8 Oct 2023 – 22 Jul 2024 holds 29 Feb
+    assert store.soonest_events(1, last_day) == [labels[0]]
+    assert store.events_between(last_day, last_day) == [labels[0]]
+
+
+# ---------- Parity on a generated catalog ----------
+SPORTS = [
+    "Football", "Table Tennis", "Badminton", "Swimming", "Running", "Yoga",
+    "Ultimate Frisbee", "Rock Climbing", "Tennis", "Rowing", "Ice Hockey", "Basketball",
+]
+WORDS = (
+    "poetry debating music band film chess robotics hiking drama choir coding salsa"
+    " baking photography gaming society club pals circle"
+).split()
+
+
+def typo(rnd, word):
+    i, c = rnd.randrange(len(word)), rnd.choice("abcdefghijklmnopqrstuvwxyz")
+    return rnd.choice([
+        word[:i] + word[i + 1 :],  # deletion
+        word[:i] + c + word[i + 1 :],  # substitution
+        word[:i] + c + word[i:],  # insertion
+        word[:i] + word[i + 1 : i + 2] + word[i : i + 1] + word[i + 2 :],  # transposition
+    ])
+
+
+def misspell(rnd, name, rate):
+    return " ".join(typo(rnd, w) if rnd.random() < rate else w for w in name.lower().split())
+
+
+def generated(seed):
+    rnd = random.Random(seed)
+    associations = [" ".join(rnd.sample(WORDS, rnd.randint(1, 3))).title() for _ in range(80)]
+    return {
+        "sports": SPORTS,
+        "associations": associations,
+        "associations.description": [
+            " ".join(rnd.choices(WORDS, k=rnd.randint(0, 6))) for _ in associations
+        ],
+        "events": random_labels(120, seed),
+    }
+
+
+def test_store_answers_like_the_catalog(tmp_path):
+    for seed in range(8):
+        rnd = random.Random(seed)
+        columns = generated(seed)
+        folder = tmp_path / str(seed)
+        folder.mkdir()
+        cat, store = build_catalog(columns), make_store(folder, columns)
+        for _ in range(30):
+            now = date(2023, 1, 1) + timedelta(days=rnd.randint(0, 2500))
+            k = rnd.choice([1, 3, 10, 200])
+            assert store.soonest_events(k, now) == cat.soonest_events(k, now), (seed, now, k)
+            first = now + timedelta(days=rnd.randint(-400, 400))
+            if rnd.random() < 0.2:
+                first = date(rnd.choice([2024, 2028]), 2, 29)
+            last = first + timedelta(days=rnd.choice([0, 1, 6, 30, 200, 400, 800]))
+            assert store.events_between(first, last) == cat.events_between(first, last), (
+                seed, first, last
+            )
+            text = f"i want to play {misspell(rnd, rnd.choice(SPORTS), 0.5)} please"
+            assert store.match_sport(text) == cat.match_sport(text), text
+            text = misspell(rnd, rnd.choice(columns["associations"]), 0.4)
+            assert store.match_associations(text) == cat.match_associations(text), text
+
+
+# ---------- Connections ----------
+def closed(con):
+    try:
+        con.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_close_shuts_every_threads_connection(tied):
+    _, _, store = tied
+    thread = threading.Thread(target=store.first_association)
+    thread.start()
+    thread.join()
+    connections = list(store._connections)
+    assert len(connections) == 2  # this thread's and the finished thread's
+    store.close()
+    assert all(closed(con) for con in connections) and store._connections == []
+    assert store.soonest_events(1, date(2027, 5, 14)) == ["E5 (17 May)"]  # reconnects
+
+
+def test_reload_retires_the_old_store(tmp_path):
+    csv = tmp_path / "unilife.csv"
+    csv.write_text("kind,name\nsport,Football\nevent,Quiz (Mondays)\n", encoding="utf-8")
+    db = tmp_path / "catalog.db"
+    watcher = CatalogWatcher(
+        csv,
+        lambda: open_store(db, csv, lambda: load_columns(csv)),
+        on_retire=CatalogStore.close,
+    )
+    old = watcher.current()
+    assert old.match_sport("football") == ("football", 0)
+    connections = list(old._connections)
+    csv.write_text("kind,name\nsport,Rowing\n", encoding="utf-8")
+    assert not watcher.check() and watcher.check()  # one quiet poll, then the swap
+    assert watcher.current().match_sport("rowing") == ("rowing", 0)
+    assert not any(closed(con) for con in connections)  # a turn may still hold it
+    watcher.check()
+    assert all(closed(con) for con in connections) and old._connections == []
@@ -0,0 +1,665 @@
+# Unibot catalog — parse data/unilife.csv once, then reuse a compiled snapshot
+# - Snapshot sits next to the CSV (data/unilife.csv.snap), stored as length-prefixed
+#   marshal frames so it is written one column slice at a time
+# - Keyed on the CSV's mtime/size, with a content-hash check when mtime moves
+# - Rebuilt only when the CSV content actually changes
+# - Parsing is stdlib-only; pandas is imported lazily by load_dataframe()
+# - Reads the native long layout (kind,name,attrs…) and the legacy wide one
+# - stream_columns() ingests huge catalogs in bounded chunks under a memory cap
+# - build_catalog() derives the immutable Catalog index every flow queries
+#   (incl. fuzzy indexes for misspelled sport and association names)
+# - load_sources() merges a directory/glob of catalogs, parsed in parallel
+# - CatalogWatcher hot-reloads the catalog in the background when the CSV changes
+from __future__ import annotations
+import codecs
+import csv
+import glob
+import hashlib
+import io
+import marshal
+import os
+import re
+import struct
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from unibot_events import EventTable, build_events, extract_event_dates, resolve_many
+from unibot_fuzzy import (
+    DeletionIndex,
+    TrigramIndex,
+    closest_name,
+    deletion_index,
+    trigram_index,
+)
+
+COLUMNS = ("sports", "associations", "events")
+SNAPSHOT_SUFFIX = ".snap"
+SNAPSHOT_FORMAT = 5
+SNAPSHOT_SLICE_BYTES = 8 << 20  # text per snapshot frame: bounds the marshal copy
+FRAME = struct.Struct("<Q")  # byte length of the marshal frame that follows
+
+
+# ---------- Parsing + normalization (stdlib only) ----------
+# Two CSV layouts are understood:
+#   long (native)  kind,name[,attr...]    one row per sport / association / event;
+#                                         extra columns are optional attributes
+#                                         (date, tags, description, ...)
+#   wide (legacy)  sports,associations,events   three independent lists side by
+#                                         side; blank padding cells are skipped
+# Both become one compact list per entity type, plus parallel "<entity>.<attr>"
+# lists for any attributes ("" where an entity doesn't set one).
+Columns = Dict[str, List[str]]
+Record = Tuple[str, str, Dict[str, str]]  # (entity, name, attributes)
+RowReader = Callable[[List[str]], Iterator[Record]]
+
+KIND_ALIASES = {
+    "sport": "sports",
+    "association": "associations",
+    "club": "associations",
+    "society": "associations",
+    "event": "events",
+}
+
+
+def entity_of(kind: str) -> str:
+    k = kind.strip().lower()
+    return KIND_ALIASES.get(k, k)
+
+
+def row_reader(header: Optional[List[str]]) -> RowReader:
+    """Validate the header and return a row → records function for its layout."""
+    names = [c.strip().lower() for c in header or []]
+    if "kind" in names and "name" in names:
+        ki, ni = names.index("kind"), names.index("name")
+        extra = [(i, c) for i, c in enumerate(names) if c and i not in (ki, ni)]
+
+        def read_long(row: List[str]) -> Iterator[Record]:
+            kind = row[ki].strip() if ki < len(row) else ""
+            name = row[ni].strip() if ni < len(row) else ""
+            if not (kind and name):
+                return
+            attrs = {c: row[i].strip() for i, c in extra if i < len(row)}
+            attrs = {c: v for c, v in attrs.items() if v}
+            entity = entity_of(kind)
+            date = attrs.get("date")
+            if entity == "events" and date and date not in name:
+                name = f"{name} ({date})"  # keep the label the flows print/parse
+            yield entity, name, attrs
+
+        return read_long
+
+    need = set(COLUMNS)
+    miss = need - set(names)
+    if miss:
+        raise ValueError(
+            f"CSV must include columns {need} (or kind,name); missing: {miss}"
+        )
+    index = [(names.index(c), c) for c in COLUMNS]
+
+    def read_wide(row: List[str]) -> Iterator[Record]:
+        for i, entity in index:
+            cell = row[i].strip() if i < len(row) else ""
+            if cell:
+                yield entity, cell, {}
+
+    return read_wide
+
+
+def entry_key(name: str) -> str:
+    key = name.casefold()
+    return " ".join(key.split()) if "  " in key or "\t" in key else key
+
+
+class CatalogBuilder:
+    """Folds normalized rows into compact per-entity lists.
+
+    Entities are kept as insertion-ordered sets keyed case/space-insensitively
+    (first spelling wins), so a merged catalog that repeats the same entries
+    costs memory only once. Later duplicates can only add attributes the entity
+    doesn't have yet — except ``source``, which collects every origin.
+    """
+
+    def __init__(self, memory_limit: Optional[int] = None, reserved: int = 0):
+        self.memory_limit = memory_limit
+        self.held = reserved  # e.g. the caller's chunk buffer
+        self.rows = 0
+        self.entries: Dict[str, Dict[str, Tuple[str, Dict[str, str]]]] = {
+            c: {} for c in COLUMNS
+        }
+
+    def add_records(self, records: Iterable[Record]):
+        entries, sizeof = self.entries, sys.getsizeof
+        held = 0
+        for entity, name, attrs in records:
+            seen = entries.get(entity)
+            if seen is None:
+                seen = entries[entity] = {}
+            key = entry_key(name)
+            entry = seen.get(key)
+            if entry is None:
+                seen[key] = (name, attrs)
+                # casefold() always makes a new string, so the key costs its own size
+                held += sizeof(name) + sizeof(key) + ENTRY_OVERHEAD
+                if attrs:
+                    held += sum(map(sizeof, attrs.values()))
+                continue
+            have = entry[1]
+            for k, v in attrs.items():
+                if k == "source" and k in have:
+                    if v not in have[k].split(";"):
+                        have[k] += ";" + v
+                else:
+                    have.setdefault(k, v)
+        self.held += held
+
+    def add_rows(self, read: RowReader, rows: List[List[str]]):
+        for row in rows:
+            self.add_records(read(row))
+        self.rows += len(rows)
+        if self.memory_limit is not None and self.held > self.memory_limit:
+            raise MemoryError(
+                f"catalog needs more than {self.memory_limit >> 20} MiB "
+                f"after {self.rows} rows; raise the memory limit"
+            )
+
+    def columns(self) -> Columns:
+        cols: Columns = {}
+        for entity, seen in self.entries.items():
+            cols[entity] = [name for name, _ in seen.values()]
+            keys = sorted({k for _, attrs in seen.values() for k in attrs})
+            for k in keys:
+                cols[f"{entity}.{k}"] = [a.get(k, "") for _, a in seen.values()]
+        return cols
+
+
+def build_columns(raw: bytes) -> Columns:
+    rows = csv.reader(io.StringIO(raw.decode("utf-8-sig"), newline=""))
+    read = row_reader(next(rows, None))
+    builder = CatalogBuilder()
+    builder.add_rows(read, [row for row in rows if row])
+    return builder.columns()
+
+
+def load_dataframe(columns: Columns):
+    """Optional analytics path — the only place pandas gets imported."""
+    import pandas as pd
+
+    # per-entity lists differ in length, so let pandas pad the short ones
+    frame = pd.DataFrame({c: pd.Series(v, dtype="string") for c, v in columns.items()})
+    labels = columns.get("events") or []
+    if labels:
+        # typed date columns next to the label, from one bulk pass over the column
+        specs = extract_event_dates(labels)
+        spans = resolve_many(specs)
+        pad = [None] * (len(frame) - len(labels))
+        frame["events.month"] = pd.array(
+            [s.month if s and s.month else None for s in specs] + pad, dtype="Int8"
+        )
+        frame["events.day"] = pd.array(
+            [s.day if s and s.month else None for s in specs] + pad, dtype="Int8"
+        )
+        frame["events.start"] = pd.to_datetime([s[0] if s else None for s in spans] + pad)
+        frame["events.end"] = pd.to_datetime([s[1] if s else None for s in spans] + pad)
+    return frame
+
+
+# ---------- Catalog index ----------
+WORD = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+def norm_words(text: str) -> str:
+    """Lowercase and collapse to single-spaced words ("Table  Tennis!" → "table tennis")."""
+    return " ".join(WORD.findall((text or "").lower()))
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Everything the flows look up, derived once per catalog load."""
+
+    sports: Tuple[str, ...]
+    sports_lower: FrozenSet[str]
+    sport_max_words: int
+    sport_index: DeletionIndex  # misspelled sport names → canonical
+    associations: Tuple[str, ...]
+    assoc_lookup: Mapping[str, str]  # lowercased name → name as listed
+    assoc_index: TrigramIndex  # fuzzy lookup over names + descriptions
+    events: EventTable  # dated relative to the load day, soonest first
+    # entity → attribute → values aligned with that entity's list as loaded
+    attributes: Mapping[str, Mapping[str, Tuple[str, ...]]]
+
+    def match_sport(self, text: str) -> Optional[Tuple[str, int]]:
+        """(sport, edits) for the sport named in ``text``, typos allowed ("badmington")."""
+        words = norm_words(text).split()
+        return closest_name(words, self.sport_max_words, self.sport_index.lookup)
+
+    def association(self, name: str) -> Optional[str]:
+        return self.assoc_lookup.get(name.lower())
+
+    def first_association(self) -> Optional[str]:
+        return self.associations[0] if self.associations else None
+
+    def match_associations(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Closest associations to ``text`` by trigram similarity, best first."""
+        return self.assoc_index.search(text, k)
+
+    def soonest_events(self, k: int = 3, now: Optional[date] = None) -> List[str]:
+        """Next ``k`` events as seen from ``now`` (default: today)."""
+        return [label for label, _ in self.events.upcoming(k, now)]
+
+    def events_between(self, first: date, last: date) -> List[str]:
+        """Events on any day from ``first`` to ``last`` (inclusive), in date order."""
+        return [label for label, _ in self.events.between(first, last)]
+
+
+def build_catalog(columns: Columns) -> Catalog:
+    sports_lower = frozenset(norm_words(s) for s in columns["sports"]) - {""}
+    assoc_lookup: Dict[str, str] = {}
+    attributes: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+    for key, values in columns.items():
+        entity, dot, attr = key.partition(".")
+        if dot:
+            attributes.setdefault(entity, {})[attr] = tuple(values)
+    for a in columns["associations"]:
+        assoc_lookup.setdefault(a.lower(), a)
+    return Catalog(
+        sports=tuple(columns["sports"]),
+        sports_lower=sports_lower,
+        sport_max_words=max((s.count(" ") + 1 for s in sports_lower), default=0),
+        sport_index=deletion_index(sports_lower),
+        associations=tuple(columns["associations"]),
+        assoc_lookup=MappingProxyType(assoc_lookup),
+        assoc_index=trigram_index(
+            columns["associations"], columns.get("associations.description", ())
+        ),
+        events=build_events(columns["events"]),
+        attributes=MappingProxyType(attributes),
+    )
+
+
+# ---------- Snapshot ----------
+def snapshot_path(path: Path) -> Path:
+    return path.with_name(path.name + SNAPSHOT_SUFFIX)
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_frame(f, size: int):
+    """The next marshalled frame, or None at the end of a ``size``-byte file."""
+    head = f.read(FRAME.size)
+    if not head:
+        return None
+    (n,) = FRAME.unpack(head)
+    if n > size - f.tell():
+        raise EOFError("truncated or foreign snapshot")  # don't allocate a bogus length
+    return marshal.loads(f.read(n))
+
+
+def _read_columns(f, size: int) -> Columns:
+    cols: Columns = {}
+    for name, values in iter(lambda: _read_frame(f, size), None):
+        cols.setdefault(name, []).extend(values)
+    return cols
+
+
+def read_snapshot(path: Path) -> Optional[Columns]:
+    """Columns from the snapshot if it still matches the CSV, else None."""
+    snap = snapshot_path(path)
+    try:
+        with open(snap, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            head = _read_frame(f, size)
+            st = path.stat()
+            if not isinstance(head, dict) or head.get("format") != SNAPSHOT_FORMAT:
+                return None
+            if head.get("size") != st.st_size:
+                return None
+            cols = _read_columns(f, size)
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+    if head.get("mtime_ns") == st.st_mtime_ns:
+        return cols
+    # mtime moved (copy, checkout, touch) — only trust it if the bytes are the same
+    try:
+        digest = file_digest(path)
+    except OSError:
+        return None
+    if digest != head.get("sha256"):
+        return None
+    write_snapshot(path, cols, digest, st)
+    return cols
+
+
+def _write_frame(f, obj):
+    body = marshal.dumps(obj)
+    f.write(FRAME.pack(len(body)))
+    f.write(body)
+
+
+def _column_slices(columns: Columns, slice_bytes: int) -> Iterator[Tuple[str, List[str]]]:
+    for name, values in columns.items():
+        start, size = 0, 0
+        for i, v in enumerate(values):
+            size += len(v) + 1
+            if size >= slice_bytes:
+                yield name, values[start : i + 1]
+                start, size = i + 1, 0
+        if start < len(values) or not values:
+            yield name, values[start:]
+
+
+def write_snapshot(
+    path: Path,
+    columns: Columns,
+    digest: str,
+    st: os.stat_result,
+    slice_bytes: int = SNAPSHOT_SLICE_BYTES,
+) -> bool:
+    """Write the snapshot frame by frame: a header, then each column in slices of
+    about ``slice_bytes`` of text, so at most one slice is ever marshalled at once."""
+    head = {
+        "format": SNAPSHOT_FORMAT,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+    }
+    snap = snapshot_path(path)
+    tmp = snap.with_name(f"{snap.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            _write_frame(f, head)
+            for frame in _column_slices(columns, slice_bytes):
+                _write_frame(f, frame)
+        os.replace(tmp, snap)  # readers never see a half-written snapshot
+    except OSError:
+        # read-only location (e.g. inside the EXE bundle): just skip caching
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_columns(path: Path) -> Columns:
+    cols = read_snapshot(path)
+    if cols is not None:
+        return cols
+    st = path.stat()
+    raw = path.read_bytes()
+    cols = build_columns(raw)
+    write_snapshot(path, cols, hashlib.sha256(raw).hexdigest(), st)
+    return cols
+
+
+# ---------- Streaming ingest (very large catalogs) ----------
+READ_BLOCK = 1 << 20
+DEFAULT_CHUNK_BYTES = 8 << 20
+DEFAULT_MEMORY_LIMIT = 1 << 30
+STREAM_THRESHOLD = 64 << 20  # bigger catalog files are ingested in bounded chunks
+ENTRY_OVERHEAD = 64  # rough per-entry cost of the dict/list slot holding a string
+
+# progress(rows_done, bytes_read, bytes_total)
+Progress = Callable[[int, int, int], None]
+
+
+def _iter_lines(f, hasher, consumed: List[int]) -> Iterator[str]:
+    dec = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    for block in iter(lambda: f.read(READ_BLOCK), b""):
+        hasher.update(block)
+        consumed[0] += len(block)
+        parts = (tail + dec.decode(block)).split("\n")
+        tail = parts.pop()
+        for line in parts:
+            yield line + "\n"
+    tail += dec.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def should_stream(path: Path, stream: Optional[bool] = None) -> bool:
+    """``stream`` when given, else whether ``path`` is past STREAM_THRESHOLD."""
+    return path.stat().st_size > STREAM_THRESHOLD if stream is None else stream
+
+
+def stream_columns(
+    path: Path,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    progress: Optional[Progress] = None,
+) -> Columns:
+    """Build the catalog from bounded chunks instead of one full read.
+
+    Raises MemoryError once the built structures outgrow ``memory_limit``. The
+    snapshot is then written in chunk-sized slices, so caching costs a buffer
+    about the size of one chunk rather than a second copy of the catalog.
+    """
+    if chunk_bytes >= memory_limit:
+        raise ValueError("chunk size must be smaller than the memory limit")
+    cols = read_snapshot(path)
+    if cols is not None:
+        return cols
+    st = path.stat()
+    hasher = hashlib.sha256()
+    consumed = [0]
+    builder = CatalogBuilder(memory_limit, reserved=chunk_bytes)
+    with open(path, "rb") as f:
+        rows = csv.reader(_iter_lines(f, hasher, consumed))
+        read = row_reader(next(rows, None))
+        chunk: List[List[str]] = []
+        size = 0
+        for row in rows:
+            if not row:
+                continue
+            chunk.append(row)
+            size += sum(map(len, row)) + ENTRY_OVERHEAD
+            if size >= chunk_bytes:
+                builder.add_rows(read, chunk)
+                chunk, size = [], 0
+                if progress:
+                    progress(builder.rows, consumed[0], st.st_size)
+        builder.add_rows(read, chunk)
+        if progress:
+            progress(builder.rows, consumed[0], st.st_size)
+    cols = builder.columns()
+    write_snapshot(path, cols, hasher.hexdigest(), st, slice_bytes=chunk_bytes)
+    return cols
+
+
+# ---------- Multi-file catalogs (per campus / per semester) ----------
+PARALLEL_MIN_BYTES = 1 << 20  # below this, worker start-up costs more than parsing
+
+
+def is_multi_source(source: Union[str, Path]) -> bool:
+    return Path(source).is_dir() or any(ch in str(source) for ch in "*?[")
+
+
+def resolve_sources(source: Union[str, Path]) -> List[Path]:
+    """A CSV file, a directory tree of *.csv files, or a glob pattern → sorted files."""
+    p = Path(source)
+    if p.is_dir():
+        return sorted(f for f in p.rglob("*.csv") if f.is_file())
+    if is_multi_source(source):
+        return sorted(Path(f) for f in glob.glob(str(source), recursive=True))
+    return [p]
+
+
+def source_tag(path: Path, root: Path) -> str:
+    """Readable origin for a record, e.g. "campus-a/2025-fall"."""
+    try:
+        rel = path.relative_to(root)
+    except ValueError:
+        rel = Path(path.name)
+    return rel.with_suffix("").as_posix()
+
+
+def columns_to_records(columns: Columns, tag: str) -> Iterator[Record]:
+    for entity in [c for c in columns if "." not in c]:
+        attr_cols = [
+            (k.partition(".")[2], v)
+            for k, v in columns.items()
+            if k.startswith(entity + ".")
+        ]
+        for i, name in enumerate(columns[entity]):
+            attrs = {a: vals[i] for a, vals in attr_cols if vals[i]}
+            attrs["source"] = tag
+            yield entity, name, attrs
+
+
+def _load_one(job: Tuple[Path, Optional[bool], int, int]) -> Columns:
+    path, stream, chunk_bytes, memory_limit = job
+    if should_stream(path, stream):
+        return stream_columns(path, chunk_bytes, memory_limit)
+    return load_columns(path)  # per-file snapshot still applies
+
+
+def load_sources(
+    source: Union[str, Path],
+    workers: Optional[int] = None,
+    stream: Optional[bool] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+) -> Columns:
+    """Parse every catalog file in ``source`` across a process pool and merge
+    them into one deduplicated catalog; each record gets a ``source`` attribute.
+    With ``stream`` unset, each file is streamed only if it is past STREAM_THRESHOLD.
+    """
+    files = resolve_sources(source)
+    if not files:
+        raise FileNotFoundError(f"No catalog files match {source}")
+    root = Path(source) if Path(source).is_dir() else Path(os.path.commonpath(files))
+    if root.is_file():
+        root = root.parent
+    jobs = [(f, stream, chunk_bytes, memory_limit) for f in files]
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    if workers > 1 and sum(f.stat().st_size for f in files) >= PARALLEL_MIN_BYTES:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_load_one, jobs))
+    else:
+        parts = [_load_one(job) for job in jobs]
+    builder = CatalogBuilder()
+    for f, cols in zip(files, parts):
+        builder.add_records(columns_to_records(cols, source_tag(f, root)))
+    return builder.columns()
+
+
+def catalog_signature(source: Union[str, Path]) -> Optional[tuple]:
+    """(file, mtime, size) for every catalog file; None while nothing matches."""
+    try:
+        sig = tuple(
+            (str(p), st.st_mtime_ns, st.st_size)
+            for p in resolve_sources(source)
+            for st in [p.stat()]
+        )
+    except OSError:
+        return None  # mid-save rename/delete — try again next poll
+    return sig or None
+
+
+# ---------- Hot reload ----------
+T = TypeVar("T")
+
+
+class CatalogWatcher(Generic[T]):
+    """Polls the catalog file(s) from a daemon thread and publishes rebuilt catalogs.
+
+    ``current()`` never waits for a reload: it hands out the last catalog
+    that finished building, so a turn that grabbed one keeps a consistent
+    view even if a newer one is swapped in meanwhile. A replaced catalog is
+    handed to ``on_retire`` (e.g. to close a store) one poll later, once
+    such turns have had time to finish.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path],
+        load: Callable[[], T],
+        interval: float = 2.0,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        on_retire: Optional[Callable[[T], None]] = None,
+    ):
+        self.source = source
+        self.interval = interval
+        self.reloads = 0
+        self._load = load
+        self._on_error = on_error
+        self._on_retire = on_retire
+        self._retired: List[T] = []
+        self._loaded_sig = self._signature()
+        self._pending_sig = self._loaded_sig
+        self._catalog = load()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="catalog-watcher", daemon=True
+        )
+
+    def _signature(self):
+        return catalog_signature(self.source)
+
+    def current(self) -> T:
+        return self._catalog
+
+    def check(self) -> bool:
+        """One poll; returns True if a new catalog was published."""
+        while self._retired:
+            self._on_retire(self._retired.pop())
+        sig = self._signature()
+        if sig is None or sig == self._loaded_sig:
+            self._pending_sig = self._loaded_sig
+            return False
+        if sig != self._pending_sig:
+            # wait for one quiet interval so we don't parse a half-saved file
+            self._pending_sig = sig
+            return False
+        catalog = self._load()
+        if self._signature() != sig:
+            if self._on_retire:
+                self._on_retire(catalog)  # never handed out
+            return False  # changed again while we were building
+        old, self._catalog = self._catalog, catalog  # single reference swap — atomic for readers
+        if self._on_retire:
+            self._retired.append(old)
+        self._loaded_sig = sig
+        self.reloads += 1
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:  # keep serving the old catalog
+                self._loaded_sig = self._pending_sig
+                if self._on_error:
+                    self._on_error(e)
+
+    def start(self) -> "CatalogWatcher[T]":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
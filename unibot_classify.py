@@ -0,0 +1,488 @@
+# Unibot classifier — topic keywords compiled once into word-level and substring matchers
+# - TokenIndex matches whole tokens/bigrams only ("run" no longer fires inside "brunch")
+# - classify_free keeps its contract: a topic only if exactly one topic has a hit
+# - the keyword config is read-only; set_topic_keywords() swaps in a new mapping,
+#   so readers iterating the old one are never disturbed
+# - use_classify_cache() optionally memoizes answers in a bounded LRU keyed on the
+#   normalized utterance (off by default: it only pays when utterances repeat)
+# - classify_many / `python unibot_classify.py LOG OUT` label logs in bulk chunks
+from __future__ import annotations
+import argparse
+import csv
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice, tee
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+_TOPICS: Dict[str, Tuple[str, ...]] = {
+    "studying": (
+        "study",
+        "studying",
+        "library",
+        "exam",
+        "course",
+        "advisor",
+        "assignment",
+        "deadline",
+        "timetable",
+        "schedule",
+        "grades",
+        "enrol",
+        "enroll",
+    ),
+    "sports": (
+        "sport",
+        "sports",
+        "gym",
+        "basketball",
+        "football",
+        "tennis",
+        "swim",
+        "training",
+        "team",
+        "aikido",
+        "yoga",
+        "run",
+        "workout",
+        "badminton",
+        "table tennis",
+    ),
+    "social": (
+        "event",
+        "party",
+        "association",
+        "club",
+        "society",
+        "friends",
+        "friend",
+        "friendshipsocial",
+        "festival",
+        "activity",
+        "fun",
+        "concert",
+        "show",
+        "meetup",
+        "meet-up",
+        "karaoke",
+        "sing",
+        "dinner",
+        "picnic",
+        "valentine",
+        "halloween",
+    ),
+}
+
+
+TOPIC_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType(_TOPICS)
+
+
+def keyword_table(
+    topics: Mapping[str, Iterable[str]]
+) -> Tuple[Tuple[str, ...], List[str], List[FrozenSet[str]]]:
+    """Topic names, distinct keywords (id = position) and each keyword's topics."""
+    keywords: List[str] = []
+    owners: Dict[str, Set[str]] = {}
+    for topic, words in topics.items():
+        for w in words:
+            if w not in owners:
+                keywords.append(w)
+                owners[w] = set()
+            owners[w].add(topic)
+    return tuple(topics), keywords, [frozenset(owners[w]) for w in keywords]
+
+
+# ---------- Token index (whole-word matching) ----------
+TOKEN = re.compile(r"[a-z0-9]+")
+VOWELS = "aeiou"
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens; punctuation and hyphens split words."""
+    return TOKEN.findall((text or "").lower())
+
+
+def inflections(word: str) -> Set[str]:
+    """Regular forms of a keyword's last word: plurals, -ing/-ed, -ment."""
+    forms = {word, word + "s", word + "es", word + "ing", word + "ed", word + "ment"}
+    if word.endswith("y"):
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}  # party → parties
+    if word.endswith("e"):
+        forms |= {word[:-1] + "ing", word[:-1] + "ed"}  # schedule → scheduling
+    if (
+        len(word) >= 3
+        and word[-1] not in VOWELS + "wxy"
+        and word[-2] in VOWELS
+        and word[-3] not in VOWELS
+    ):
+        forms |= {word + word[-1] + "ing", word + word[-1] + "ed"}  # run → running
+    return forms
+
+
+class TokenIndex:
+    """Inverted index from keyword forms (space-joined token n-grams) to keyword ids.
+
+    The utterance is tokenized once; its token set (plus n-grams starting at a
+    multi-word keyword's first token) is intersected with the index, so a
+    keyword only ever matches whole words: "show" fires for "shows" but not
+    for "shower", "table tennis" fires for "table-tennis".
+    """
+
+    def __init__(self, topics: Mapping[str, Iterable[str]]):
+        self.topics, self.keywords, self.keyword_topics = keyword_table(topics)
+        index: Dict[str, Set[int]] = {}
+        heads: Set[str] = set()
+        self.max_words = 1
+        for i, w in enumerate(self.keywords):
+            *lead, last = tokens(w)
+            for form in inflections(last):
+                index.setdefault(" ".join([*lead, form]), set()).add(i)
+            if lead:
+                heads.add(lead[0])
+                self.max_words = max(self.max_words, len(lead) + 1)
+        self.index: Dict[str, FrozenSet[int]] = {
+            form: frozenset(ids) for form, ids in index.items()
+        }
+        self._heads = frozenset(heads)
+
+    def grams(self, words: List[str]) -> Set[str]:
+        """Every token of ``words`` plus the n-grams a multi-word keyword could need."""
+        grams = set(words)
+        heads = self._heads
+        if not heads.isdisjoint(grams):
+            for i, w in enumerate(words):
+                if w in heads:
+                    for n in range(2, self.max_words + 1):
+                        grams.add(" ".join(words[i : i + n]))
+        return grams
+
+    def keyword_ids(self, text: str) -> Set[int]:
+        """Ids of every keyword occurring as whole words in ``text``."""
+        index = self.index
+        found: Set[int] = set()
+        for form in index.keys() & self.grams(tokens(text)):
+            found |= index[form]
+        return found
+
+    def topic_hits(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords per topic found in ``text``."""
+        hits = dict.fromkeys(self.topics, 0)
+        for i in self.keyword_ids(text):
+            for topic in self.keyword_topics[i]:
+                hits[topic] += 1
+        return hits
+
+
+TOPIC_INDEX = TokenIndex(TOPIC_KEYWORDS)
+
+
+# ---------- Memo cache ----------
+CACHE_SIZE = 4096
+CACHE_MAX_CHARS = 200  # long messages rarely repeat; keying them costs more than it saves
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used map with hit/miss/eviction counters.
+
+    ``compute`` runs outside the lock, so concurrent sessions never queue behind
+    one another's misses; two threads missing on the same key just both compute.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, compute: Callable[[], object]):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self.hits, self.misses, self.evictions, len(self._data), self.maxsize
+            )
+
+
+CLASSIFY_CACHE: Optional[LRUCache] = None  # see use_classify_cache()
+_CONFIG_LOCK = threading.Lock()
+_ACTIVE: Tuple[int, TokenIndex] = (0, TOPIC_INDEX)  # (config generation, its index)
+
+
+def cache_key(text: str) -> str:
+    """Normalized utterance: its tokens, which is all classify_free looks at."""
+    return " ".join(tokens(text))
+
+
+def use_classify_cache(maxsize: Optional[int] = CACHE_SIZE) -> Optional[LRUCache]:
+    """Memoize classify_free in a fresh LRU of ``maxsize`` entries; 0/None turns it off.
+
+    Off by default. A hit saves only 1–3 µs over matching the tokens again
+    and a miss adds about 1 µs of keying, so on mostly-unique text the cache
+    is a net loss (bench/classifiers.py); turn it on where the same short
+    answers keep coming back.
+    """
+    global CLASSIFY_CACHE
+    with _CONFIG_LOCK:
+        CLASSIFY_CACHE = LRUCache(maxsize) if maxsize else None
+        return CLASSIFY_CACHE
+
+
+def set_topic_keywords(topics: Mapping[str, Iterable[str]]) -> None:
+    """Swap in a new keyword configuration; cached answers are dropped.
+
+    TOPIC_KEYWORDS is rebound to a new read-only mapping rather than edited,
+    so code still iterating the old one (a running classify_many, say) keeps
+    a consistent view; read ``unibot_classify.TOPIC_KEYWORDS`` to see the new
+    one. Cache entries are keyed by config generation too, so a lookup that
+    started under the old keywords can't leave a stale answer behind.
+    """
+    global TOPIC_KEYWORDS, TOPIC_INDEX, _ACTIVE
+    fresh = MappingProxyType({topic: tuple(words) for topic, words in topics.items()})
+    index = TokenIndex(fresh)
+    with _CONFIG_LOCK:
+        TOPIC_KEYWORDS = fresh
+        TOPIC_INDEX = index
+        _ACTIVE = (_ACTIVE[0] + 1, index)
+        if CLASSIFY_CACHE is not None:
+            CLASSIFY_CACHE.clear()
+
+
+# ---------- Topic inferencer (free-text only) ----------
+def classify_free(text: str) -> Optional[str]:
+    generation, index = _ACTIVE
+    cache = CLASSIFY_CACHE
+    if cache is None or len(text or "") > CACHE_MAX_CHARS:
+        return decide_free(index.topic_hits(text))
+    key = cache_key(text)
+    return cache.get((generation, key), lambda: decide_free(index.topic_hits(key)))
+
+
+def decide_free(topic_hits: Dict[str, int]) -> Optional[str]:
+    hits = {k: int(v > 0) for k, v in topic_hits.items()}
+    if sum(hits.values()) == 0 or list(hits.values()).count(1) > 1:
+        return None
+    return max(hits, key=hits.get)
+
+
+# ---------- Batch classification (offline log labelling) ----------
+def trie_pattern(words: Iterable[str], gap: Optional[str] = None) -> str:
+    """Regex alternation shaped like a trie, preferring the longest word.
+
+    With ``gap``, a space inside a word matches that pattern instead.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [
+            (gap if gap and ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if "" in node:
+            alts.append("")  # word ends here; tried last so longer words win
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+
+SEP = "\0"  # joins texts for one bulk regex pass; no pattern can match across it
+
+
+def join_lowered(texts: Sequence[str]) -> Tuple[str, List[int]]:
+    """``texts`` lowercased and joined by SEP, and the offset each one starts at.
+
+    A SEP inside a text becomes a space, so the i-th text always owns
+    ``blob[starts[i]:starts[i + 1] - 1]`` and ``bisect_right(starts, pos) - 1``
+    maps a match position back to its text.
+    """
+    if not texts:
+        return "", []
+    blob = SEP.join(texts)
+    if blob.count(SEP) != len(texts) - 1:
+        blob = SEP.join(t.replace(SEP, " ") for t in texts)
+    blob = blob.lower()
+    return blob, [0] + [m.end() for m in re.finditer(SEP, blob)]
+
+
+BatchRow = Tuple[Optional[str], float, Dict[str, int]]
+
+
+class BatchMatcher:
+    """Keyword hits for a whole chunk of utterances with one regex pass.
+
+    The chunk is joined into one string and scanned by a single compiled,
+    trie-shaped lookahead over the TokenIndex forms, anchored at token
+    boundaries, so the per-character work happens inside the regex engine;
+    Python only touches the (few) matches. At each token the longest form is
+    reported and every shorter form that is its leading n-gram is added, which
+    yields exactly the keywords classify_free would find in each utterance.
+    """
+
+    def __init__(self, topics: Mapping[str, Iterable[str]]):
+        self.matcher = TokenIndex(topics)  # keyword forms + owning topics
+        index = self.matcher.index
+        self._prefixes: Dict[str, FrozenSet[int]] = {}
+        for form in index:
+            words = form.split(" ")
+            self._prefixes[form] = frozenset().union(
+                *(index.get(" ".join(words[:n]), ()) for n in range(1, len(words) + 1))
+            )
+        word = "a-z0-9"
+        self._re = re.compile(
+            f"(?<![{word}])(?=({trie_pattern(index, gap=f'[^{word}{SEP}]+')})(?![{word}]))"
+        )
+
+    def chunk_rows(self, texts: List[str]) -> List[BatchRow]:
+        blob, starts = join_lowered(texts)
+        found: Dict[int, Set[int]] = {}
+        prefixes = self._prefixes
+        for m in self._re.finditer(blob):
+            line = bisect_right(starts, m.start()) - 1
+            form = m.group(1)
+            if form not in prefixes:  # multi-word form spelled with other separators
+                form = " ".join(TOKEN.findall(form))
+            ids = found.get(line)
+            if ids is None:
+                found[line] = set(prefixes[form])
+            else:
+                ids.update(prefixes[form])
+        topics, owners = self.matcher.topics, self.matcher.keyword_topics
+        zero = dict.fromkeys(topics, 0)
+        rows: List[BatchRow] = [(None, 0.0, zero.copy()) for _ in texts]
+        for line, ids in found.items():
+            hits = zero.copy()
+            for i in ids:
+                for topic in owners[i]:
+                    hits[topic] += 1
+            rows[line] = decide(hits)
+        return rows
+
+
+def decide(hits: Dict[str, int]) -> BatchRow:
+    """classify_free's topic rule + classify_with_conf's hits/3 confidence."""
+    topic = decide_free(hits)
+    if topic is None:
+        return None, 0.0, hits
+    return topic, min(1.0, hits[topic] / 3.0), hits
+
+
+def iter_classify(
+    texts: Iterable[object],
+    chunk_size: int = 10_000,
+    matcher: Optional[BatchMatcher] = None,
+) -> Iterator[BatchRow]:
+    """Lazily classify any iterable (file lines, Series, generator) chunk by chunk."""
+    matcher = matcher or BatchMatcher(TOPIC_KEYWORDS)
+    it = iter(texts)
+    while True:
+        chunk = [t if isinstance(t, str) else "" for t in islice(it, chunk_size)]
+        if not chunk:
+            return
+        yield from matcher.chunk_rows(chunk)
+
+
+def classify_many(texts: Iterable[object], chunk_size: int = 10_000):
+    """Topics, confidences and per-topic hit counts for a batch of utterances.
+
+    Returns a list of ``(topic, confidence, hits)``; for a pandas Series the
+    result is a DataFrame on the same index (columns topic, confidence and
+    one ``hits_<topic>`` column per topic).
+    """
+    matcher = BatchMatcher(TOPIC_KEYWORDS)  # one config for the rows and the columns
+    rows = iter_classify(texts, chunk_size, matcher)
+    if type(texts).__module__.startswith("pandas"):
+        import pandas as pd
+
+        rows = list(rows)
+        frame = pd.DataFrame(
+            {
+                "topic": [r[0] for r in rows],
+                "confidence": [r[1] for r in rows],
+            },
+            index=texts.index,
+        )
+        for topic in matcher.matcher.topics:
+            frame[f"hits_{topic}"] = [r[2][topic] for r in rows]
+        return frame
+    return list(rows)
+
+
+def label_file(src: Path, dst: Path, chunk_size: int = 10_000) -> int:
+    """Stream a chat-log export (one utterance per line) into a labelled CSV."""
+    n = 0
+    matcher = BatchMatcher(TOPIC_KEYWORDS)
+    topics = matcher.matcher.topics
+    with open(src, encoding="utf-8", errors="replace") as fin, open(
+        dst, "w", encoding="utf-8", newline=""
+    ) as fout:
+        out = csv.writer(fout)
+        out.writerow(["text", "topic", "confidence", *(f"hits_{t}" for t in topics)])
+        lines = (line.rstrip("\r\n") for line in fin)
+        texts, rows = tee(lines)
+        for text, (topic, conf, hits) in zip(texts, iter_classify(rows, chunk_size, matcher)):
+            out.writerow([text, topic or "", f"{conf:.2f}", *hits.values()])
+            n += 1
+    return n
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Label exported chat logs by topic")
+    ap.add_argument("log", type=Path, help="text file, one utterance per line")
+    ap.add_argument("out", type=Path, help="CSV to write")
+    ap.add_argument("--chunk-size", type=int, default=10_000)
+    args = ap.parse_args(argv)
+    n = label_file(args.log, args.out, args.chunk_size)
+    print(f"✅ Labelled {n:,} lines → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
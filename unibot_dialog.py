@@ -0,0 +1,394 @@
+# Unibot dialog — the conversation as a resumable state machine, no I/O
+# - a Session is the whole per-student state (which question is pending); it is
+#   immutable and plain data, so one process can hold thousands of them
+# - turn(cat, session, text) → (next session, bot messages); start() opens a chat
+# - each step handler answers the pending question and either asks the next one or
+#   ends the flow with "Do you need anything else?" (step "more")
+# - the catalog is passed per turn, so a hot reload lands between two answers
+# - Unibot.py's terminal loop and any other front end are thin drivers over this
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from unibot_catalog import Catalog
+from unibot_classify import classify_free
+from unibot_events import parse_time_phrase
+
+if TYPE_CHECKING:
+    from unibot_recommend import AssociationRecommender
+
+MAX_LISTED = 10  # events shown for a date-range question
+# a time phrase next to these is about when to join, not which events to attend
+ASSOC_CUES = ("association", "club", "society", "join")
+
+GREETING = "Hello student,What can I help you with today? (free text, no options)"
+ASK_TOPIC_AGAIN = "I didn’t quite catch that—tell me more: are we talking studies, sports, or social life?"
+ASK_MORE = "Do you need anything else? (free text)"
+ASK_CONTINUE = "Got it — do you want to continue or end it here?"
+ASK_STUDY_NEED = "Tell me what you need around studies right now—are you struggling with something, or just after practical info?"
+ASK_STUDY_SHARE = "Would you be comfortable sharing this with other students, or would you prefer to keep it private?"
+ASK_SPORT = "Tell me about the sport situation—do you already have a specific sport in mind, or are you exploring?"
+ASK_SPORT_NAME = "Which sport do you have in mind?"
+ASK_SPORT_PREF = "Describe what you want from a sport (e.g., team vibes, ball games, cardio, strength):"
+ASK_SOCIAL = "What are you looking for socially—upcoming events to attend or joining an association? Say it in your own words."
+ASK_ASSOC_PREF = "Describe what kind of association fits you (e.g., international, artistic, debate, business, wellness, music, film, science, language):"
+
+
+# ---------- Associations ----------
+ASSOC_PREFS = {
+    "international": "Language Club",
+    "art": "Painting and Pottery",
+    "creative": "Painting and Pottery",
+    "debate": "Debate Club",
+    "science": "Science Society",
+    "tech": "Science Society",
+    "poetry": "Poetry Pals",
+    "music": "Music Band",
+    "film": "Film Appreciation",
+    "startup": "Entrepreneur Society",
+    "yoga": "Yoga Circle",
+    "language": "Language Club",
+}
+
+
+def closest_association(cat: Catalog, text: str) -> Optional[str]:
+    found = cat.match_associations(text, 1)
+    return found[0][0] if found else None
+
+
+def map_assoc(cat: Catalog, free_text: str) -> str:
+    t = free_text.lower()
+    for k, v in ASSOC_PREFS.items():
+        if k in t:
+            # the preferred club may be listed under a slightly different name
+            a = cat.association(v) or closest_association(cat, v)
+            if a:
+                return a
+    # no theme word — maybe they named (or described) a club themselves
+    return closest_association(cat, free_text) or cat.first_association() or "Debate Club"
+
+
+# (catalog, its recommender) swapped as one tuple, so concurrent sessions never
+# see a recommender paired with the wrong catalog
+_RECOMMENDER: list = [(None, None)]
+
+
+def assoc_recommender(cat: Catalog) -> Optional["AssociationRecommender"]:
+    """Built once per loaded catalog; None without numpy or on the SQLite store.
+    numpy is imported on first use, so starting the bot doesn't pay for it."""
+    if not isinstance(cat, Catalog):
+        return None
+    built_for, rec = _RECOMMENDER[0]
+    if built_for is not cat:
+        try:
+            from unibot_recommend import build_recommender
+        except ImportError:  # the slim build ships without numpy
+            return None
+        rec = build_recommender(cat.associations, cat.attributes.get("associations", {}))
+        _RECOMMENDER[0] = (cat, rec)
+    return rec
+
+
+def recommend_assocs(cat: Catalog, free_text: str, n: int = 3) -> List[str]:
+    """Top ``n`` associations for the request, best first (never empty)."""
+    rec = assoc_recommender(cat)
+    picks = [name for name, _ in rec.top(free_text, n=n)] if rec else []
+    return picks or [map_assoc(cat, free_text)]
+
+
+# ---------- Sports ----------
+TYPE_MAP = {
+    "team": ["football", "basketball"],
+    "ball": ["football", "basketball", "tennis", "table tennis"],
+    "cardio": ["running", "swimming", "badminton"],
+    "strength": ["aikido"],
+    "martial": ["aikido"],
+    "racket": ["tennis", "badminton", "table tennis"],
+}
+
+
+def rec_sport(avail: set[str], desc: str) -> str:
+    t = (desc or "").lower()
+    order = [
+        k for k in ["team", "ball", "cardio", "strength", "martial", "racket"] if k in t
+    ] or ["team", "cardio", "racket"]
+    for key in order:
+        for s in TYPE_MAP[key]:
+            if s in avail:
+                return s.title()
+    return next(iter(avail), "Basketball").title()
+
+
+def sport_available(match: Optional[Tuple[str, int]]) -> Optional[str]:
+    """The reply for a sport on the list (naming it if they misspelled it)."""
+    if match is None:
+        return None
+    sport, edits = match
+    heard = f" ({sport.title()}, I think)" if edits else ""
+    return f" That sport{heard} is available. → Check the University Sports Centre website. (brief: specific + available)"
+
+
+# ---------- Loop control (continue/close + remainder) ----------
+def wants_more_and_remainder(text: str):
+    """
+    Return:
+      (True, remainder)  -> user wants more; 'remainder' is what's after the yes/intent cue
+      (False, "")        -> user is done
+      (None, "")         -> unclear
+    Handles: 'yes, ...', 'more ...', 'also ...', 'next ...', 'i want ...', 'need ...', 'help ...'
+    """
+    t = (text or "").strip()
+    low = t.lower()
+
+    # explicit NO wins
+    no_words = (
+        "no",
+        "nope",
+        "nah",
+        "n",
+        "all good",
+        "im good",
+        "i'm good",
+        "that’s all",
+        "thats all",
+        "thanks",
+        "thank you",
+        "done",
+        "finish",
+        "exit",
+        "quit",
+        "nothing else",
+        "i'm fine",
+        "im fine",
+    )
+    if any(w in low for w in no_words):
+        return False, ""
+
+    # strong YES cues (start or anywhere)
+    yes_heads = (
+        r"(?:yes|yep|yeah|y|sure|ok(?:ay)?|please|continue|more|another|also|next)"
+    )
+    need_heads = r"(?:i\s+want|i\s+need|need|want|help|tell\s+me|info|information)"
+    m = re.match(rf"^\s*(?:{yes_heads}|{need_heads})[\s,.:;-]*(.*)$", low, flags=re.I)
+    if m:
+        remainder = (m.group(1) or "").strip()
+        return True, remainder
+
+    # soft intent: contains topic keywords → likely wants more
+    soft_yes_terms = (
+        "sport",
+        "study",
+        "exam",
+        "advisor",
+        "event",
+        "association",
+        "club",
+        "social",
+    )
+    if any(w in low for w in soft_yes_terms):
+        return True, low  # treat whole line as next query
+
+    return None, ""
+
+
+# ---------- State machine ----------
+@dataclass(frozen=True)
+class Session:
+    """One student's place in the conversation: the question waiting for an answer."""
+
+    step: str = "topic"
+
+    @property
+    def closed(self) -> bool:
+        return self.step == "closed"
+
+
+Reply = Tuple[Session, List[str]]
+CLOSED = Session("closed")
+
+
+def start() -> Reply:
+    """A fresh chat: the greeting, waiting for the first request."""
+    return Session("topic"), [GREETING]
+
+
+def turn(cat: Catalog, session: Session, text: str) -> Reply:
+    """Answer ``text`` in ``session``; the last message is the next question
+    unless the returned session is closed."""
+    if session.closed:
+        return session, []
+    return STEPS[session.step](cat, (text or "").strip())
+
+
+def finish(messages: List[str]) -> Reply:
+    """A flow is done: its answer, then offer more."""
+    return Session("more"), messages + [ASK_MORE]
+
+
+def route(cat: Catalog, topic: Optional[str]) -> Reply:
+    if topic == "studying":
+        return Session("study_need"), [ASK_STUDY_NEED]
+    if topic == "sports":
+        return Session("sport"), [ASK_SPORT]
+    if topic == "social":
+        return Session("social"), [ASK_SOCIAL]
+    return finish(["I couldn’t confidently infer the topic from free text this time."])
+
+
+def on_topic(cat: Catalog, text: str) -> Reply:
+    topic = classify_free(text)
+    if topic is None:
+        return Session("topic_again"), [ASK_TOPIC_AGAIN]
+    return route(cat, topic)
+
+
+def on_topic_again(cat: Catalog, text: str) -> Reply:
+    return route(cat, classify_free(text))
+
+
+def on_study_need(cat: Catalog, text: str) -> Reply:
+    if any(
+        k in text.lower()
+        for k in ["strug", "problem", "issue", "stuck", "anxious", "stress", "fail"]
+    ):
+        return Session("study_share"), [ASK_STUDY_SHARE]
+    return finish(
+        [
+            " Suggestion: use the Student Desk contact form for practical info. (brief: practical → Student Desk)"
+        ]
+    )
+
+
+def on_study_share(cat: Catalog, text: str) -> Reply:
+    if any(k in text.lower() for k in ["share", "students", "group", "public", "others"]):
+        return finish(
+            [
+                " Suggestion: join a study group. (brief: struggling + willing to share → study group)"
+            ]
+        )
+    return finish(
+        [
+            " Suggestion: contact the student advisor. (brief: struggling + not sharing → advisor)"
+        ]
+    )
+
+
+def on_sport(cat: Catalog, text: str) -> Reply:
+    t1 = text.lower()
+    # 1) If a sport name is already mentioned, handle it right away.
+    found = sport_available(cat.match_sport(t1))
+    if found:
+        return finish([found])
+    # 2) If the user said "yes" (or similar) but didn't name the sport, ask for it.
+    yes_words = ("yes", "yep", "yeah", "y", "sure", "ok", "okay", "affirmative")
+    if any(t1.startswith(w) or f" {w} " in f" {t1} " for w in yes_words):
+        return Session("sport_name"), [ASK_SPORT_NAME]
+    # 3) Exploring → follow-up then recommend.
+    return Session("sport_pref"), [ASK_SPORT_PREF]
+
+
+def on_sport_name(cat: Catalog, text: str) -> Reply:
+    found = sport_available(cat.match_sport(text.lower()))
+    if found:
+        return finish([found])
+    # unknown sport → preference-based recommendation
+    return Session("sport_pref"), [
+        " I couldn’t find that exact sport on the campus list.",
+        ASK_SPORT_PREF,
+    ]
+
+
+def on_sport_pref(cat: Catalog, text: str) -> Reply:
+    suggestion = rec_sport(cat.sports_lower, text)
+    return finish(
+        [
+            f"Recommendation: {suggestion} (brief: exploring → follow-up → recommend from available list)"
+        ]
+    )
+
+
+def on_social(cat: Catalog, text: str) -> Reply:
+    t = text.lower()
+    out: List[str] = []
+    window = None
+    if not any(c in t for c in ASSOC_CUES):
+        window = parse_time_phrase(t)  # "this weekend", "in March", "next 10 days"…
+    if window is not None:
+        found = cat.events_between(window.first, window.last)
+        if found:
+            out.append(f"🎉 Campus events {window.label}:")
+            out += [f" • {e}" for e in found[:MAX_LISTED]]
+            if len(found) > MAX_LISTED:
+                out.append(f"   …and {len(found) - MAX_LISTED} more")
+            out.append("(brief: events path → date range)")
+            return finish(out)
+        out.append(f"Nothing on the calendar {window.label} — here's what's coming up next.")
+    if window is not None or any(
+        k in t
+        for k in [
+            "event",
+            "party",
+            "show",
+            "concert",
+            "karaoke",
+            "dinner",
+            "picnic",
+            "festival",
+        ]
+    ):
+        out.append("🎉 The three soonest campus events:")
+        out += [f" • {e}" for e in cat.soonest_events(3)]
+        out.append("(brief: events path → 3 soonest)")
+        return finish(out)
+    return Session("assoc_pref"), [ASK_ASSOC_PREF]
+
+
+def on_assoc_pref(cat: Catalog, text: str) -> Reply:
+    picks = recommend_assocs(cat, text)
+    out = [f"➡️ Try joining: {picks[0]} (brief: association path → follow-up → recommend)"]
+    if len(picks) > 1:
+        out.append("   Also a good fit: " + ", ".join(picks[1:]))
+    return finish(out)
+
+
+def carry_on(cat: Catalog, remainder: str, ack: str) -> Reply:
+    """They want more: treat ``remainder`` as the next request, or greet again."""
+    if not remainder:
+        return Session("topic"), [ack, GREETING]
+    session, messages = on_topic(cat, remainder)
+    return session, [ack] + messages
+
+
+def on_more(cat: Catalog, text: str) -> Reply:
+    more, remainder = wants_more_and_remainder(text)
+    if more is True:
+        if remainder:
+            return carry_on(cat, remainder, "Cool — continuing with that.")
+        return carry_on(cat, "", "Cool — tell me what you need next.")
+    if more is False:
+        return CLOSED, ["Got you. Closing the chat — have a solid day! "]
+    return Session("more_again"), [ASK_CONTINUE]
+
+
+def on_more_again(cat: Catalog, text: str) -> Reply:
+    more, remainder = wants_more_and_remainder(text)
+    if more is True:
+        session, messages = carry_on(cat, remainder, "Alright, continuing with that.")
+        return session, messages if remainder else messages[1:]
+    return CLOSED, ["All good. Ending here — take care! "]
+
+
+STEPS: Dict[str, Callable[[Catalog, str], Reply]] = {
+    "topic": on_topic,
+    "topic_again": on_topic_again,
+    "study_need": on_study_need,
+    "study_share": on_study_share,
+    "sport": on_sport,
+    "sport_name": on_sport_name,
+    "sport_pref": on_sport_pref,
+    "social": on_social,
+    "assoc_pref": on_assoc_pref,
+    "more": on_more,
+    "more_again": on_more_again,
+}
@@ -0,0 +1,605 @@
+# Unibot events — event-label date parsing shared by the flows
+# - one precompiled pattern, run once per catalog load
+# - extract_event_dates() scans the whole column in one pass for the "(18 Dec)" form
+# - "18 Dec", "Dec 18", "13-15 March", "30 Jan – 2 Feb", "Fri 13 Jan 2027", "(Fridays)"
+# - weekly events need a full day name ("Quiz every Thursday") or a day alone in
+#   parentheses ("(Mon)"), so "SAT Prep" or "Sun Salutation Yoga" stay undated
+# - labels without a year recur yearly: the year is inferred so the event is not over
+# - EventTable keeps labels + start/end date ordinals in compact arrays, soonest first
+# - EventTable.upcoming(k, now) returns the k next events for any clock, wrapping the year
+# - EventTable.between() + parse_time_phrase() answer "this weekend" / "in March"
+# - KeywordIndex maps vibe/energy keywords to the events that mention them
+from __future__ import annotations
+import calendar
+import heapq
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from unibot_classify import join_lowered, trie_pattern
+
+MONTH = {
+    "jan": 1,
+    "january": 1,
+    "feb": 2,
+    "february": 2,
+    "mar": 3,
+    "march": 3,
+    "apr": 4,
+    "april": 4,
+    "may": 5,
+    "jun": 6,
+    "june": 6,
+    "jul": 7,
+    "july": 7,
+    "aug": 8,
+    "august": 8,
+    "sep": 9,
+    "sept": 9,
+    "september": 9,
+    "oct": 10,
+    "october": 10,
+    "nov": 11,
+    "november": 11,
+    "dec": 12,
+    "december": 12,
+}
+WEEKDAY = {
+    name: i
+    for i, names in enumerate(
+        (
+            ("mon", "monday"),
+            ("tue", "tues", "tuesday"),
+            ("wed", "weds", "wednesday"),
+            ("thu", "thur", "thurs", "thursday"),
+            ("fri", "friday"),
+            ("sat", "saturday"),
+            ("sun", "sunday"),
+        )
+    )
+    for stem in names
+    for name in (stem, stem + "s")
+}
+
+
+def _words(names: Iterable[str]) -> str:
+    # trie-shaped: rejects a non-match on its first letter, still prefers "march" to "mar"
+    return trie_pattern(names)
+
+
+_MON = rf"(?:{_words(MONTH)})\b\.?"
+_WD = rf"\b(?:{_words(WEEKDAY)})\b"
+_FULL_WD = rf"\b(?:{_words(d for d in WEEKDAY if d.endswith(('day', 'days')))})\b"
+_ORD = r"(?:st|nd|rd|th)?"
+_DASH = r"\s*(?:-|–|—|to)\s*"
+_DATE = rf"""
+    (?:(?P<wd>{_WD})\.?,?\s+)?                     # optional weekday
+    (?:
+        (?P<d1>\d{{1,2}}){_ORD}                    # 13 Jan | 13-15 Jan | 30 Jan - 2 Feb
+        (?:\s*(?P<ma>{_MON}))?
+        (?:{_DASH}(?P<d2>\d{{1,2}}){_ORD})?
+        \s*(?P<mb>{_MON})
+      |
+        (?P<mc>{_MON})\s+                          # Jan 13 | Jan 13-15
+        (?P<d3>\d{{1,2}}){_ORD}
+        (?:{_DASH}(?P<d4>\d{{1,2}}){_ORD})?\b
+    )
+    (?:,?\s+(?P<year>\d{{4}}))?
+"""
+# both are matched against lowercased labels
+DATE_RE = re.compile(
+    rf"""
+    (?:(?P<paren>\()\s*|(?<![a-z0-9])(?=[a-z0-9])) # only start at "(" or a word
+    {_DATE}
+    |
+    (?P<weekly>{_FULL_WD}|(?<=\(){_WD}(?=\s*\)))     # "Fridays", "(Fri)": recurs weekly
+    """,
+    re.VERBOSE,
+)
+# Just the parenthesized dates: starts with a literal "(", so the engine skips
+# straight to candidates. Its matches are exactly DATE_RE's paren matches,
+# since no other DATE_RE match can contain a "(".
+PAREN_RE = re.compile(rf"(?P<paren>\()\s*{_DATE}", re.VERBOSE)
+
+
+class EventDate(NamedTuple):
+    """A label's date as written; month 0 marks a weekly event (weekday only)."""
+
+    year: Optional[int]
+    month: int
+    day: int
+    end_month: int
+    end_day: int
+    weekday: Optional[int]
+
+
+def _month(word: Optional[str]) -> int:
+    return MONTH[word.rstrip(".")] if word else 0
+
+
+@lru_cache(maxsize=4096)
+def _event_date(groups: Tuple[Optional[str], ...]) -> EventDate:
+    """EventDate from DATE_RE's groups after ``paren`` (cached: dates repeat a lot)."""
+    wd, d1, ma, d2, mb, mc, d3, d4, year, weekly = groups
+    if weekly:
+        return EventDate(None, 0, 0, 0, 0, WEEKDAY[weekly])
+    if d1:
+        end_month = _month(mb)
+        month = _month(ma) or end_month
+        day, end_day = int(d1), int(d2 or d1)
+    else:
+        month = end_month = _month(mc)
+        day, end_day = int(d3), int(d4 or d3)
+    return EventDate(int(year) if year else None, month, day, end_month, end_day, WEEKDAY.get(wd))
+
+
+def parse_event_date(label: str) -> Optional[EventDate]:
+    """Date written in ``label``; one in parentheses wins, a bare weekday comes last."""
+    best: Optional[EventDate] = None
+    weekly: Optional[EventDate] = None
+    for m in DATE_RE.finditer(label.lower()):
+        paren, *groups = m.groups()
+        found = _event_date(tuple(groups))
+        if found.month == 0:
+            weekly = weekly or found
+        elif paren:
+            return found
+        elif best is None:
+            best = found
+    return best or weekly
+
+
+def extract_event_dates(labels: Sequence[str]) -> List[Optional[EventDate]]:
+    """parse_event_date for a whole column, mostly in one bulk regex pass.
+
+    The labels are joined and lowercased once and PAREN_RE — which the regex
+    engine can skip through quickly — picks up every "(13 Jan)"-style date;
+    a moving cursor assigns matches back to their label. Only labels without
+    one go through the full per-label parse. Same results as parse_event_date.
+    """
+    blob, starts = join_lowered(labels)
+    out: List[Optional[EventDate]] = [None] * len(labels)
+    line = 0
+    for m in PAREN_RE.finditer(blob):
+        line = bisect_right(starts, m.start(), line) - 1
+        if out[line] is None:
+            out[line] = _event_date(m.groups()[1:] + (None,))
+    for i, found in enumerate(out):
+        if found is None:
+            out[i] = parse_event_date(labels[i])
+    return out
+
+
+def occurrence(spec: EventDate, year: int) -> Optional[Tuple[date, date]]:
+    """(start, end) of a dated ``spec`` starting in ``year``; None if no such day."""
+    try:
+        start = date(year, spec.month, spec.day)
+        wraps = (spec.end_month, spec.end_day) < (spec.month, spec.day)
+        return start, date(year + wraps, spec.end_month, spec.end_day)
+    except ValueError:
+        return None  # 29 Feb outside a leap year, 31 Apr, ...
+
+
+def resolve(spec: EventDate, today: date) -> Optional[Tuple[date, date]]:
+    """Concrete (start, end) dates; yearless dates take the first year not yet over."""
+    if spec.month == 0:
+        start = today + timedelta(days=(spec.weekday - today.weekday()) % 7)
+        return start, start
+    years = [spec.year] if spec.year else range(today.year - 1, today.year + 9)
+    for year in years:
+        span = occurrence(spec, year)
+        if span is not None and (spec.year or span[1] >= today):
+            return span
+    return None
+
+
+YEARLY, ONCE, WEEKLY = 0, 1, 2  # how an event recurs (EventTable.kinds)
+
+Occurrence = Tuple[int, int, int]  # (start ordinal, catalog position, row)
+
+
+@dataclass(frozen=True)
+class EventTable:
+    """Events sorted by start date (undated ones last), dates as ordinals.
+
+    ``starts``/``ends``/``kinds`` only cover the first ``len(starts)`` labels;
+    the rest had no usable date and are kept in catalog order for completeness.
+    Yearly events are resolved into the year starting at ``today``. Per-kind
+    row lists let each cursor skip straight to the rows it can use. Events on
+    the same day come out in catalog order (``positions``), as from the store.
+    """
+
+    today: date
+    labels: Tuple[str, ...]
+    starts: array
+    ends: array
+    kinds: array
+    positions: array  # each dated row's index in the catalog's events column
+    weekly: Tuple[int, ...]  # rows of WEEKLY events
+    max_span: int  # longest (end - start) of a non-weekly event, in days
+    dated: array  # rows of YEARLY and ONCE events, in row (= start) order
+    dated_starts: array  # their starts, for bisecting
+    yearly: array  # rows of YEARLY events, in row order
+    yearly_starts: array
+    by_weekday: Tuple[Tuple[int, ...], ...]  # Monday..Sunday → WEEKLY rows
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def dates(self, i: int) -> Optional[Tuple[date, date]]:
+        if i >= len(self.starts):
+            return None
+        return date.fromordinal(self.starts[i]), date.fromordinal(self.ends[i])
+
+    def upcoming(
+        self, k: int = 3, now: Optional[date] = None
+    ) -> List[Tuple[str, Optional[date]]]:
+        """The ``k`` soonest events not over at ``now``, with their next start date.
+
+        Within a year of ``today`` this walks the pre-sorted arrays from a bisect
+        cursor: rows still ahead, then rows that already happened this cycle
+        shifted to next year, merged lazily with the weekly events — O(log n + k)
+        for typical catalogs. Any other clock falls back to heap selection.
+        Undated events pad the list when fewer than ``k`` are dated.
+        """
+        n = (now or date.today()).toordinal()
+        if 0 <= n - self.today.toordinal() < 365:
+            streams = (self._ahead(n), self._wrapped(n), self._weekly(n))
+            found = list(islice(heapq.merge(*streams), k))
+        else:
+            found = heapq.nsmallest(k, self._occurrences(n))
+        out: List[Tuple[str, Optional[date]]] = [
+            (self.labels[i], date.fromordinal(start)) for start, _, i in found
+        ]
+        undated = self.labels[len(self.starts) : len(self.starts) + k - len(out)]
+        return out + [(label, None) for label in undated]
+
+    def between(self, first: date, last: date) -> List[Tuple[str, date]]:
+        """Events happening on any day in ``[first, last]``, in date order.
+
+        Each yearly row is stored once, so the window is bisected once per
+        year offset it can reach (a handful; 29 Feb rows sit up to four years
+        out): O(log n + hits). An event is listed once, at its first start
+        that overlaps the window; weekly ones at their first day in it.
+        """
+        starts, ends, kinds, pos = self.starts, self.ends, self.kinds, self.positions
+        dated, dated_starts = self.dated, self.dated_starts
+        a, b = first.toordinal(), last.toordinal()
+        base = self.today.year
+        found: List[Occurrence] = []
+        for shift in {0, *range(first.year - base - 4, last.year - base + 2)}:
+            # 29 Feb rounds down, so lo/hi may let in a row or two; checked below
+            lo, hi = _add_years(first, -shift), _add_years(last, -shift)
+            for j in range(
+                bisect_left(dated_starts, lo - self.max_span),
+                bisect_right(dated_starts, hi),
+            ):
+                i = dated[j]
+                if ends[i] < lo or (shift and kinds[i] != YEARLY):
+                    continue
+                start = _add_years(date.fromordinal(starts[i]), shift, exact=True)
+                end = _add_years(date.fromordinal(ends[i]), shift, exact=True)
+                if start is not None and end is not None and start <= b and end >= a:
+                    found.append((start, pos[i], i))
+        for i in self.weekly:
+            start = a + (starts[i] - a) % 7
+            if start <= b:
+                found.append((start, pos[i], i))
+        found.sort()
+        seen: Set[int] = set()
+        out: List[Tuple[str, date]] = []
+        for start, _, i in found:
+            if i not in seen:  # a window over a year meets a yearly row twice
+                seen.add(i)
+                out.append((self.labels[i], date.fromordinal(start)))
+        return out
+
+    def _ahead(self, n: int) -> Iterator[Occurrence]:
+        starts, ends, pos, dated = self.starts, self.ends, self.positions, self.dated
+        for j in range(bisect_left(self.dated_starts, n - self.max_span), len(dated)):
+            i = dated[j]
+            if ends[i] >= n:
+                yield starts[i], pos[i], i
+
+    def _wrapped(self, n: int) -> Iterator[Occurrence]:
+        # only yearly rows, and of those only the ones still running at n are skipped
+        starts, ends, pos, yearly = self.starts, self.ends, self.positions, self.yearly
+        for j in range(bisect_left(self.yearly_starts, n)):
+            i = yearly[j]
+            if ends[i] < n:
+                d, e = date.fromordinal(starts[i]), date.fromordinal(ends[i])
+                start, end = _add_years(d, 1, exact=True), _add_years(e, 1, exact=True)
+                if start is not None and end is not None:
+                    yield start, pos[i], i
+                # else 29 Feb — the next one is years away, not next year
+
+    def _weekly(self, n: int) -> Iterator[Occurrence]:
+        # one weekday at a time; a day's rows are already in catalog order
+        wd, pos = date.fromordinal(n).weekday(), self.positions
+        for offset in range(7):
+            for i in self.by_weekday[(wd + offset) % 7]:
+                yield n + offset, pos[i], i
+
+    def _occurrences(self, n: int) -> Iterator[Occurrence]:
+        year, pos = date.fromordinal(n).year, self.positions
+        for i, (start, end, kind) in enumerate(zip(self.starts, self.ends, self.kinds)):
+            if kind == WEEKLY:
+                yield n + (start - n) % 7, pos[i], i
+            elif kind == ONCE:
+                if end >= n:
+                    yield start, pos[i], i
+            else:
+                # move both ends: a span over 29 Feb is a day longer in leap years
+                d, e = date.fromordinal(start), date.fromordinal(end)
+                for y in range(year - 1, year + 9):
+                    s = _add_years(d, y - d.year, exact=True)
+                    last = _add_years(e, y - d.year, exact=True)
+                    if s is not None and last is not None and last >= n:
+                        yield s, pos[i], i
+                        break
+
+
+def resolve_many(
+    specs: Iterable[Optional[EventDate]], today: Optional[date] = None
+) -> List[Optional[Tuple[date, date]]]:
+    """resolve() for a whole column; each distinct date is resolved only once."""
+    today = today or date.today()
+    memo: Dict[EventDate, Optional[Tuple[date, date]]] = {}
+    out: List[Optional[Tuple[date, date]]] = []
+    for spec in specs:
+        if spec is None:
+            out.append(None)
+        else:
+            if spec not in memo:
+                memo[spec] = resolve(spec, today)
+            out.append(memo[spec])
+    return out
+
+
+def _add_years(d: date, years: int, exact: bool = False) -> Optional[int]:
+    """Ordinal of ``d`` moved by whole years; 29 Feb becomes 28 Feb (or None if exact)."""
+    try:
+        return d.replace(year=d.year + years).toordinal()
+    except ValueError:
+        return None if exact else d.replace(year=d.year + years, day=28).toordinal()
+
+
+def event_table(
+    events: Iterable[Tuple[str, Optional[EventDate]]], today: Optional[date] = None
+) -> EventTable:
+    """Resolve already-parsed ``(label, EventDate)`` pairs against ``today``."""
+    today = today or date.today()
+    dated: List[Tuple[int, int, str, int, int]] = []
+    undated: List[str] = []
+    pairs = list(events)
+    labels = [label for label, _ in pairs]
+    specs = [spec for _, spec in pairs]
+    for pos, (label, spec, span) in enumerate(zip(labels, specs, resolve_many(specs, today))):
+        if span is None:
+            undated.append(label)
+        else:
+            kind = WEEKLY if spec.month == 0 else ONCE if spec.year else YEARLY
+            dated.append((span[0].toordinal(), span[1].toordinal(), label, kind, pos))
+    dated.sort(key=lambda e: (e[0], e[4]))
+    rows: Dict[int, List[int]] = {YEARLY: [], ONCE: [], WEEKLY: []}
+    for i, e in enumerate(dated):
+        rows[e[3]].append(i)
+    not_weekly = sorted(rows[YEARLY] + rows[ONCE])
+    by_weekday: List[List[int]] = [[] for _ in range(7)]
+    for i in rows[WEEKLY]:
+        by_weekday[date.fromordinal(dated[i][0]).weekday()].append(i)
+    return EventTable(
+        today=today,
+        labels=tuple([e[2] for e in dated] + undated),
+        starts=array("l", [e[0] for e in dated]),
+        ends=array("l", [e[1] for e in dated]),
+        kinds=array("b", [e[3] for e in dated]),
+        positions=array("l", [e[4] for e in dated]),
+        weekly=tuple(rows[WEEKLY]),
+        max_span=max((e[1] - e[0] for e in dated if e[3] != WEEKLY), default=0),
+        dated=array("l", not_weekly),
+        dated_starts=array("l", [dated[i][0] for i in not_weekly]),
+        yearly=array("l", rows[YEARLY]),
+        yearly_starts=array("l", [dated[i][0] for i in rows[YEARLY]]),
+        by_weekday=tuple(map(tuple, by_weekday)),
+    )
+
+
+def build_events(labels: Iterable[str], today: Optional[date] = None) -> EventTable:
+    """Parse every label once and index them relative to ``today``."""
+    labels = list(labels)
+    return event_table(zip(labels, extract_event_dates(labels)), today)
+
+
+def parse_events(ev: List[str]) -> List[Tuple[str, int, int]]:
+    """(label, month, day) soonest first; undated labels last as (label, 13, 99)."""
+    table = build_events(ev)
+    out = []
+    for i, label in enumerate(table.labels):
+        span = table.dates(i)
+        out.append((label, span[0].month, span[0].day) if span else (label, 13, 99))
+    return out
+
+
+# ---------- Time phrases ("this weekend", "in March", "next 10 days") ----------
+class TimeWindow(NamedTuple):
+    first: date
+    last: date
+    label: str  # what the user asked for, e.g. "this weekend"
+
+
+COUNT = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+         "seven": 7, "eight": 8, "nine": 9, "ten": 10, "couple of": 2, "few": 3}
+UNIT_DAYS = {"day": 1, "week": 7, "month": 30}
+_BARE_MONTHS = [m for m in MONTH if len(m) > 3 and m != "may"]  # "may" is a verb too
+_DAYS = [d for d in WEEKDAY if len(d) > 5]  # full names only when they stand alone
+TIME_RE = re.compile(
+    rf"""
+    \b(?:
+        (?P<today>today|tonight)
+      | (?P<tomorrow>tomorrow)
+      | (?P<which>this|the|next|coming)\s+(?P<unit>weekend|week|month|year)
+      | (?:in|within|over)\s+an?\s+(?P<one>day|week|month)  # not "once a week"
+      | (?:in|within|over)?\s*(?:the\s+)?(?:next|coming|upcoming)?\s*
+        (?P<count>\d{{1,3}}|{_words(COUNT)})\s+(?P<span>day|week|month)s?
+      | (?P<before>before|until|till|by)\s+(?P<limit>[^,.;!?]+)
+      | (?:in|during|for)\s+(?P<month>{_words(MONTH)})
+      | (?P<bare_month>{_words(_BARE_MONTHS)})
+      | (?:on\s+)?(?:(?P<next_day>next|coming)\s+)?(?P<weekday>{_words(_DAYS)})
+    )\b
+    """,
+    re.VERBOSE,
+)
+
+
+def _month_window(year: int, month: int, today: date) -> Tuple[date, date]:
+    first = max(date(year, month, 1), today)
+    return first, date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _next_month(month: int, today: date) -> Tuple[date, date]:
+    year = today.year + (month < today.month)
+    return _month_window(year, month, today)
+
+
+def parse_time_phrase(text: str, today: Optional[date] = None) -> Optional[TimeWindow]:
+    """First time expression in ``text`` as an inclusive date window, else None.
+
+    A match that names no usable day ("by the way …") is skipped, so a later
+    one ("… this weekend") can still answer.
+    """
+    today = today or date.today()
+    t = (text or "").lower()
+    m = TIME_RE.search(t)
+    while m is not None:
+        window = _window(m, today)
+        if window is not None:
+            return window
+        m = TIME_RE.search(t, m.start() + 1)
+    return None
+
+
+def _limit_day(limit: str, today: date) -> Optional[date]:
+    """The day a "before/until/by …" limit names, if the limit starts with one:
+    a date ("13 March", "friday") or a relative phrase ("tomorrow", "next friday")."""
+    limit = limit.strip()
+    m = DATE_RE.match(limit)
+    if m is not None:
+        spec = _event_date(tuple(m.groups()[1:]))
+        span = resolve(spec, today)
+        return span[0] if span else None
+    m = TIME_RE.match(limit)
+    if m is None or m.group("before"):
+        return None
+    window = _window(m, today)
+    return window.first if window else None
+
+
+def _window(m: "re.Match[str]", today: date) -> Optional[TimeWindow]:
+    g = m.group
+    wd = today.weekday()
+    label = " ".join(m.group(0).split())
+    if g("today"):
+        return TimeWindow(today, today, label)
+    if g("tomorrow"):
+        day = today + timedelta(days=1)
+        return TimeWindow(day, day, label)
+    if g("which"):
+        later = g("which") == "next"
+        unit = g("unit")
+        if g("which") == "the" and unit != "weekend":
+            return None  # "the weekend" is a date; "the week(s)/year" rarely is
+        if unit == "weekend":
+            sat = today - timedelta(days=1) if wd == 6 else today + timedelta(days=5 - wd)
+            sat += timedelta(days=7 * later)
+            return TimeWindow(max(sat, today), sat + timedelta(days=1), label)
+        if unit == "week":
+            if later:
+                mon = today + timedelta(days=7 - wd)
+                return TimeWindow(mon, mon + timedelta(days=6), label)
+            return TimeWindow(today, today + timedelta(days=6 - wd), label)
+        if unit == "month":
+            if later:
+                year, month = divmod(today.year * 12 + today.month, 12)  # month is 0-based
+                return TimeWindow(*_month_window(year, month + 1, today), label)
+            return TimeWindow(*_month_window(today.year, today.month, today), label)
+        if later:
+            return TimeWindow(date(today.year + 1, 1, 1), date(today.year + 1, 12, 31), label)
+        return TimeWindow(today, date(today.year, 12, 31), label)
+    if g("one"):
+        return TimeWindow(today, today + timedelta(days=UNIT_DAYS[g("one")]), label)
+    if g("count"):
+        count = int(g("count")) if g("count").isdigit() else COUNT[g("count")]
+        return TimeWindow(today, today + timedelta(days=count * UNIT_DAYS[g("span")]), label)
+    if g("before"):
+        day = _limit_day(g("limit"), today)
+        if day is None:
+            return None
+        end = day - timedelta(days=g("before") == "before")  # "until"/"by" include it
+        return TimeWindow(today, end, label) if end >= today else None
+    month = g("month") or g("bare_month")
+    if month:
+        return TimeWindow(*_next_month(MONTH[month], today), label)
+    ahead = (WEEKDAY[g("weekday")] - wd) % 7
+    if g("next_day"):
+        ahead = ahead or 7  # "next friday" on a Friday is a week away
+    day = today + timedelta(days=ahead)
+    return TimeWindow(day, day, label)
+
+
+# ---------- Keyword index (vibe/energy picks) ----------
+@dataclass(frozen=True)
+class KeywordIndex:
+    """keyword → ids of the labels containing it; an id is the label's position.
+
+    Built once over the vocabulary the flows can ask for, so a pick is a union
+    of posting lists instead of a substring test per label per keyword.
+    Keywords outside that vocabulary match nothing.
+    """
+
+    labels: Tuple[str, ...]  # in the order given (chronological for the flows)
+    postings: Dict[str, Tuple[int, ...]]  # ascending ids
+
+    def first(self, k: int, any_of: Iterable[str]) -> List[str]:
+        """The first ``k`` labels containing any of ``any_of``, in the labels' order."""
+        out: List[str] = []
+        last = -1
+        for i in heapq.merge(*(self.postings.get(w, ()) for w in set(any_of))):
+            if i != last:  # a label can sit in several posting lists
+                out.append(self.labels[i])
+                if len(out) == k:
+                    break
+                last = i
+        return out
+
+
+def keyword_index(labels: Iterable[str], vocab: Iterable[str]) -> KeywordIndex:
+    """Case-insensitive substring postings for ``vocab``, one str.find sweep per word."""
+    labels = tuple(labels)
+    blob, starts = join_lowered(labels)
+    following = starts[1:] + [len(blob) + 1]  # where the next label starts
+    postings: Dict[str, Tuple[int, ...]] = {}
+    for word in {w.lower() for w in vocab if w}:
+        ids = []
+        pos = blob.find(word)
+        while pos != -1:
+            line = bisect_right(starts, pos) - 1
+            ids.append(line)
+            pos = blob.find(word, following[line])
+        postings[word] = tuple(ids)
+    return KeywordIndex(labels, postings)
@@ -0,0 +1,272 @@
+# Unibot fuzzy matching — typo-tolerant lookups over catalog names
+# - trigrams(): character trigrams per word, padded so word starts weigh more
+# - TrigramIndex: trigram → posting list over names and descriptions, built per load
+# - a name scores by Dice similarity, or by how much of the query it contains
+#   ("debate" ~ "Debating Society"); a description only by the latter, discounted
+#   so a close name always outranks a description hit
+# - search() reads the postings of the query's rarest trigrams only: anything that
+#   could reach the threshold must share one of them (prefix filtering), so common
+#   trigrams like "clu"/"ety" are never scanned
+# - DeletionIndex resolves misspelled sport names ("badmington", "tabel tennis") to
+#   the canonical name + edit distance via a SymSpell-style deletion dictionary
+from __future__ import annotations
+import heapq
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from unibot_classify import tokens
+
+PART_WEIGHT = 0.8  # best score for a name that merely contains the query
+DESC_WEIGHT = 0.7  # best score for a description hit
+MIN_SIMILARITY = 0.5  # below this a "match" is mostly shared letters
+
+Grams = FrozenSet[str]
+
+
+def trigrams(text: str) -> Grams:
+    """{"  d", " de", "deb", ...} for every word of ``text`` (pg_trgm-style padding)."""
+    grams = set()
+    for word in tokens(text):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def score(shared: int, query_size: int, name_size: Optional[int] = None) -> float:
+    """Score for ``shared`` trigrams with a name of ``name_size`` (None = description)."""
+    if name_size is None:
+        return DESC_WEIGHT * shared / query_size
+    return max(2 * shared / (query_size + name_size), PART_WEIGHT * shared / query_size)
+
+
+def similarity(query: Grams, name: Grams, desc: Grams = frozenset()) -> float:
+    if not query:
+        return 0.0
+    n = len(query)
+    return max(score(len(query & name), n, len(name)), score(len(query & desc), n))
+
+
+def min_shared(query_size: int, min_score: float, desc: bool = False) -> int:
+    """Fewest trigrams a name (or description) must share with the query to score
+    ``min_score``. For names Dice is the more lenient score: t·|q|/(2−t)."""
+    bound = min_score / DESC_WEIGHT if desc else min_score / (2 - min_score)
+    return max(1, math.ceil(bound * query_size - 1e-9))
+
+
+def probe_grams(query: Grams, frequency: Callable[[str], int], need: int) -> List[str]:
+    """The rarest query trigrams; anything sharing ``need`` of them shares one of these."""
+    if need > len(query):
+        return []
+    by_rarity = sorted(query, key=lambda g: (frequency(g), g))
+    return by_rarity[: len(query) - need + 1]
+
+
+def reachable(
+    hits: Iterable[Tuple[int, int, Optional[int]]],
+    slack: int,
+    query_size: int,
+    min_score: float,
+) -> Iterator[int]:
+    """Ids from (id, probe trigrams shared, name size or None) that could still reach
+    ``min_score`` if they also shared all ``slack`` trigrams left out of the probe."""
+    for i, shared, size in hits:
+        most = shared + slack if size is None else min(shared + slack, size)
+        if score(most, query_size, size) >= min_score:
+            yield i
+
+
+def top(
+    scored: Iterable[Tuple[int, float]], k: int, min_score: float
+) -> List[Tuple[int, float]]:
+    """Best ``k`` (id, score) at or above ``min_score``; ties go to the lower id."""
+    ranked = heapq.nlargest(k, ((s, -i) for i, s in scored if s >= min_score))
+    return [(-i, s) for s, i in ranked]
+
+
+@dataclass(frozen=True)
+class TrigramIndex:
+    """Names (+ optional descriptions) indexed by trigram; ids follow the names."""
+
+    names: Tuple[str, ...]
+    name_grams: Tuple[Grams, ...]
+    desc_grams: Tuple[Grams, ...]  # empty sets where there is no description
+    name_postings: Dict[str, Tuple[int, ...]]  # trigram → ids
+    desc_postings: Dict[str, Tuple[int, ...]]
+
+    def candidates(self, query: Grams, min_score: float) -> Set[int]:
+        n = len(query)
+        found: Set[int] = set()
+        for postings, desc in ((self.name_postings, False), (self.desc_postings, True)):
+            need = min_shared(n, min_score, desc)
+            probe = probe_grams(query, lambda g: len(postings.get(g, ())), need)
+            shared: Counter = Counter()
+            for g in probe:
+                shared.update(postings.get(g, ()))
+            hits = (
+                (i, c, None if desc else len(self.name_grams[i]))
+                for i, c in shared.items()
+            )
+            found.update(reachable(hits, n - len(probe), n, min_score))
+        return found
+
+    def search(
+        self, text: str, k: int = 3, min_score: float = MIN_SIMILARITY
+    ) -> List[Tuple[str, float]]:
+        """Up to ``k`` (name, score) pairs, best first; ties keep the catalog order."""
+        query = trigrams(text)
+        if not query:
+            return []
+        scored = (
+            (i, similarity(query, self.name_grams[i], self.desc_grams[i]))
+            for i in self.candidates(query, min_score)
+        )
+        return [(self.names[i], s) for i, s in top(scored, k, min_score)]
+
+
+def _postings(docs: Sequence[Grams]) -> Dict[str, Tuple[int, ...]]:
+    lists: Dict[str, List[int]] = {}
+    for i, grams in enumerate(docs):
+        for g in grams:
+            lists.setdefault(g, []).append(i)
+    return {g: tuple(ids) for g, ids in lists.items()}
+
+
+def trigram_index(
+    names: Sequence[str], descriptions: Sequence[str] = ()
+) -> TrigramIndex:
+    """Index ``names``; ``descriptions`` line up with them ("" or missing = none)."""
+    name_grams = tuple(trigrams(n) for n in names)
+    desc_grams = tuple(
+        trigrams(descriptions[i]) if i < len(descriptions) else frozenset()
+        for i in range(len(names))
+    )
+    return TrigramIndex(
+        names=tuple(names),
+        name_grams=name_grams,
+        desc_grams=desc_grams,
+        name_postings=_postings(name_grams),
+        desc_postings=_postings(desc_grams),
+    )
+
+
+# ---------- Edit distance (sport names) ----------
+MAX_EDITS = 2  # deletions indexed per name; max_edits() decides what is accepted
+
+
+def max_edits(name: str) -> int:
+    """Typos tolerated for ``name``: none for short words ("yoga" vs "your"),
+    one below 9 letters ("swinging" is two away from "swimming")."""
+    n = len(name)
+    return 0 if n <= 4 else 1 if n <= 8 else 2
+
+
+def deletes(word: str, depth: int = MAX_EDITS) -> Set[str]:
+    """``word`` plus every string reachable by deleting up to ``depth`` characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (transpositions cost 1); anything above
+    ``limit`` comes back as ``limit + 1``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return min(prev[-1], limit + 1)
+
+
+def nearest(word: str, candidates: Iterable[str]) -> Optional[Tuple[str, int]]:
+    """(name, distance) of the closest candidate within its max_edits(), if any;
+    ties go to the alphabetically first name. A typo must keep the first letter:
+    slips rarely hit it, while real words do differ there ("cunning", "running")."""
+    best: Optional[Tuple[str, int]] = None
+    for name in sorted(set(candidates)):
+        limit = max_edits(name) if name[:1] == word[:1] else 0
+        if best is not None:
+            limit = min(limit, best[1] - 1)
+        if limit < 0:
+            break
+        d = edit_distance(word, name, limit)
+        if d <= limit:
+            best = (name, d)
+    return best
+
+
+@dataclass(frozen=True)
+class DeletionIndex:
+    """SymSpell-style lookup: each name is filed under all of its ≤ MAX_EDITS
+    deletions, so a typo finds its name through a deletion they share."""
+
+    variants: Dict[str, Tuple[str, ...]]  # deletion variant → names
+    shortest: int
+    longest: int
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        if not self.shortest - MAX_EDITS <= len(word) <= self.longest + MAX_EDITS:
+            return None
+        found: Set[str] = set()
+        for v in deletes(word):
+            found.update(self.variants.get(v, ()))
+        return nearest(word, found)
+
+
+def deletion_index(names: Iterable[str]) -> DeletionIndex:
+    names = sorted(set(names))
+    lists: Dict[str, List[str]] = {}
+    for name in names:
+        for v in deletes(name):
+            lists.setdefault(v, []).append(name)
+    return DeletionIndex(
+        variants={v: tuple(ns) for v, ns in lists.items()},
+        shortest=min(map(len, names), default=0),
+        longest=max(map(len, names), default=0),
+    )
+
+
+def closest_name(
+    words: Sequence[str],
+    max_words: int,
+    lookup: Callable[[str], Optional[Tuple[str, int]]],
+) -> Optional[Tuple[str, int]]:
+    """Best hit among the word n-grams of an utterance: the longest name wins
+    ("tabel tennis" over "tennis"), then the fewest edits ("i basketball" is
+    still the exact "basketball"), then the leftmost."""
+    best: Optional[Tuple[str, int]] = None
+    best_key = (0, 0)
+    for i in range(len(words)):
+        for n in range(1, min(max_words + 1, len(words) - i) + 1):  # +1: "basket ball"
+            hit = lookup(" ".join(words[i : i + n]))
+            if hit is None:
+                continue
+            key = (hit[0].count(" ") + 1, -hit[1])
+            if best is None or key > best_key:
+                best, best_key = hit, key
+    return best
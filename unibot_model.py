@@ -0,0 +1,345 @@
+# Unibot topic model — multinomial naive Bayes over hashed word n-grams
+# - `python unibot_model.py train LABELS.csv -o data/topic_model.nbm` learns from a
+#   CSV with text,topic columns (e.g. a hand-corrected classify_many export);
+#   an empty or "none" topic marks utterances with no clear topic
+# - model file: tiny JSON header + one float32 matrix, memory-mapped on load
+# - confidences are temperature-scaled on a held-out split, so 0.8 means ~80% right
+# - classify keeps the classify_with_conf contract: studying/sports/social or None
+from __future__ import annotations
+import argparse
+import csv
+import json
+import os
+import random
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from unibot_classify import tokens
+
+MAGIC = b"UNIBOTNB"
+MODEL_FORMAT = 1
+TOPICS = ("studying", "sports", "social")
+NONE_LABEL = "none"
+DEFAULT_BUCKETS = 1 << 16
+DEFAULT_NGRAM = 2
+DEFAULT_ALPHA = 0.1
+ALIGN = 64
+
+
+# ---------- Features ----------
+def features(text: str, ngram: int = DEFAULT_NGRAM) -> List[str]:
+    """Word unigrams up to ``ngram``-grams of the tokenized utterance."""
+    words = tokens(text)
+    grams = list(words)
+    for n in range(2, ngram + 1):
+        grams += [" ".join(words[i : i + n]) for i in range(len(words) - n + 1)]
+    return grams
+
+
+def hashed(text: str, buckets: int, ngram: int = DEFAULT_NGRAM) -> np.ndarray:
+    """Feature bucket ids; crc32 keeps them stable across runs and machines."""
+    mask = buckets - 1
+    return np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) & mask for g in features(text, ngram)),
+        dtype=np.int64,
+    )
+
+
+def hashed_batch(
+    texts: Sequence[str], buckets: int, ngram: int = DEFAULT_NGRAM
+) -> Tuple[np.ndarray, np.ndarray]:
+    """All feature ids of a batch plus the row each one belongs to."""
+    ids = [hashed(t, buckets, ngram) for t in texts]
+    rows = np.repeat(np.arange(len(ids)), [len(i) for i in ids])
+    flat = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    return flat, rows
+
+
+# ---------- Model ----------
+class TopicModel:
+    """Log-likelihood table (labels × buckets) plus priors and a temperature."""
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        prior: np.ndarray,
+        weights: np.ndarray,
+        floor: np.ndarray,
+        ngram: int = DEFAULT_NGRAM,
+        temperature: float = 1.0,
+    ):
+        self.labels = tuple(labels)
+        self.prior = np.asarray(prior, dtype=np.float64)
+        self.weights = weights  # may be a read-only memmap
+        # value of an unseen feature, rounded like the float32 weights so that an
+        # unseen word's lift is exactly 0 rather than a rounding error above it
+        self.floor = np.asarray(floor, dtype=np.float32).astype(np.float64)
+        self.ngram = ngram
+        self.temperature = temperature
+        self.buckets = weights.shape[1]
+        self._topic_rows = [i for i, lab in enumerate(self.labels) if lab != NONE_LABEL]
+
+    def logits(self, texts: Sequence[str]) -> np.ndarray:
+        """Unscaled class scores, shape (len(texts), labels)."""
+        ids, rows = hashed_batch(texts, self.buckets, self.ngram)
+        cols = np.asarray(self.weights[:, ids], dtype=np.float64)
+        out = np.empty((len(texts), len(self.labels)))
+        for c in range(len(self.labels)):
+            out[:, c] = np.bincount(rows, weights=cols[c], minlength=len(texts))
+        return out + self.prior
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return softmax(self.logits(texts) / self.temperature)
+
+    def known(self, texts: Sequence[str]) -> np.ndarray:
+        """Per text: does any n-gram score above the unseen-feature floor? Without
+        one the scores only differ by per-class smoothing, which is no evidence."""
+        ids, rows = hashed_batch(texts, self.buckets, self.ngram)
+        lift = np.asarray(self.weights[:, ids], dtype=np.float64) - self.floor[:, None]
+        seen = (lift > 0).any(axis=0)
+        return np.bincount(rows, weights=seen, minlength=len(texts)) > 0
+
+    def classify(self, text: str) -> Tuple[Optional[str], float, Dict[str, int]]:
+        """(topic, calibrated confidence, per-topic evidence) — None when unclear.
+
+        Evidence counts, per topic, the utterance's n-grams that point at it
+        most strongly; it stands in for the old keyword hits in the "why" line.
+        """
+        hits = dict.fromkeys((self.labels[i] for i in self._topic_rows), 0)
+        ids = hashed(text, self.buckets, self.ngram)
+        if not len(ids):
+            return None, 0.0, hits
+        cols = np.asarray(self.weights[:, ids], dtype=np.float64)
+        lift = cols - self.floor[:, None]
+        if not (lift > 0).any():
+            return None, 0.0, hits  # nothing the model has seen before
+        for c, score in zip(lift.argmax(axis=0), lift.max(axis=0)):
+            if score > 0 and self.labels[c] in hits:
+                hits[self.labels[c]] += 1
+        proba = softmax((cols.sum(axis=1) + self.prior)[None, :] / self.temperature)[0]
+        best = int(proba.argmax())
+        if self.labels[best] == NONE_LABEL:
+            return None, 0.0, hits
+        return self.labels[best], float(proba[best]), hits
+
+    def classify_many(self, texts: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return [
+            (None, 0.0) if self.labels[b] == NONE_LABEL or not k
+            else (self.labels[b], float(p[b]))
+            for k, b, p in zip(self.known(texts), best, proba)
+        ]
+
+
+def softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ---------- Training ----------
+def read_labelled(path: Path) -> Tuple[List[str], List[str]]:
+    """Utterances and labels from a CSV with ``text`` and ``topic`` columns."""
+    texts: List[str] = []
+    labels: List[str] = []
+    allowed = set(TOPICS) | {NONE_LABEL}
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        header = [c.strip().lower() for c in reader.fieldnames or []]
+        if not {"text", "topic"}.issubset(header):
+            raise ValueError(f"{path}: CSV must include columns text, topic")
+        reader.fieldnames = header
+        for line, row in enumerate(reader, start=2):
+            label = (row["topic"] or "").strip().lower() or NONE_LABEL
+            if label not in allowed:
+                raise ValueError(
+                    f"{path}:{line}: unknown topic {label!r} (use {', '.join(sorted(allowed))})"
+                )
+            texts.append(row["text"] or "")
+            labels.append(label)
+    return texts, labels
+
+
+def fit(
+    texts: Sequence[str],
+    labels: Sequence[str],
+    buckets: int = DEFAULT_BUCKETS,
+    ngram: int = DEFAULT_NGRAM,
+    alpha: float = DEFAULT_ALPHA,
+    temperature: float = 1.0,
+) -> TopicModel:
+    """Multinomial NB with additive smoothing over hashed n-gram counts."""
+    if buckets & (buckets - 1):
+        raise ValueError("buckets must be a power of two")
+    seen = set(labels)
+    names = [t for t in (*TOPICS, NONE_LABEL) if t in seen]
+    index = {lab: i for i, lab in enumerate(names)}
+    y = np.array([index[lab] for lab in labels])
+    ids, rows = hashed_batch(texts, buckets, ngram)
+    counts = np.bincount(y[rows] * buckets + ids, minlength=len(names) * buckets)
+    counts = counts.reshape(len(names), buckets).astype(np.float64)
+    totals = counts.sum(axis=1, keepdims=True) + alpha * buckets
+    weights = np.log(counts + alpha) - np.log(totals)
+    floor = np.log(alpha) - np.log(totals[:, 0])
+    docs = np.bincount(y, minlength=len(names))
+    prior = np.log(docs + 1.0) - np.log(len(y) + len(names))
+    return TopicModel(names, prior, weights.astype(np.float32), floor, ngram, temperature)
+
+
+def calibrate(model: TopicModel, texts: Sequence[str], labels: Sequence[str]) -> float:
+    """Temperature minimising held-out negative log-likelihood; 1.0 when the
+    minimum sits on the edge of the grid (a held-out split the model separates
+    perfectly keeps "improving" as t → 0, which only inflates confidence)."""
+    index = {lab: i for i, lab in enumerate(model.labels)}
+    keep = [i for i, lab in enumerate(labels) if lab in index]
+    if not keep:
+        return 1.0
+    z = model.logits([texts[i] for i in keep])
+    y = np.array([index[labels[i]] for i in keep])
+    grid = np.geomspace(0.05, 50.0, 240)
+    nll = [
+        -np.log(np.clip(softmax(z / t)[np.arange(len(y)), y], 1e-12, None)).mean()
+        for t in grid
+    ]
+    best = int(np.argmin(nll))
+    if best in (0, len(grid) - 1):
+        return 1.0
+    return float(grid[best])
+
+
+def evaluate(
+    model: TopicModel, texts: Sequence[str], labels: Sequence[str], bins: int = 10
+) -> Dict[str, float]:
+    """Accuracy and expected calibration error of the predicted label."""
+    proba = model.predict_proba(texts)
+    pred = proba.argmax(axis=1)
+    conf = proba.max(axis=1)
+    right = np.array([model.labels[p] == lab for p, lab in zip(pred, labels)])
+    ece = 0.0
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        m = (conf > lo) & (conf <= hi)
+        if m.any():
+            ece += m.mean() * abs(right[m].mean() - conf[m].mean())
+    return {"n": len(labels), "accuracy": float(right.mean()), "ece": float(ece)}
+
+
+def train(
+    texts: Sequence[str],
+    labels: Sequence[str],
+    buckets: int = DEFAULT_BUCKETS,
+    ngram: int = DEFAULT_NGRAM,
+    alpha: float = DEFAULT_ALPHA,
+    holdout: float = 0.2,
+    seed: int = 0,
+) -> Tuple[TopicModel, Dict[str, float]]:
+    """Fit on a split, calibrate + score on the held-out part, refit on everything."""
+    order = list(range(len(texts)))
+    random.Random(seed).shuffle(order)
+    cut = int(len(order) * (1 - holdout)) if holdout > 0 else len(order)
+    fit_idx, held_idx = order[:cut], order[cut:]
+    report: Dict[str, float] = {"temperature": 1.0}
+    temperature = 1.0
+    if held_idx:
+        part = fit(
+            [texts[i] for i in fit_idx], [labels[i] for i in fit_idx], buckets, ngram, alpha
+        )
+        held_t, held_y = [texts[i] for i in held_idx], [labels[i] for i in held_idx]
+        temperature = calibrate(part, held_t, held_y)
+        part.temperature = temperature
+        report = {"temperature": temperature, **evaluate(part, held_t, held_y)}
+    return fit(texts, labels, buckets, ngram, alpha, temperature), report
+
+
+# ---------- Model file ----------
+def save_model(model: TopicModel, path: Path) -> None:
+    header = {
+        "format": MODEL_FORMAT,
+        "labels": list(model.labels),
+        "prior": model.prior.tolist(),
+        "floor": model.floor.tolist(),
+        "buckets": model.buckets,
+        "ngram": model.ngram,
+        "temperature": model.temperature,
+    }
+    blob = json.dumps(header).encode("utf-8")
+    offset = -(-(len(MAGIC) + 4 + len(blob)) // ALIGN) * ALIGN
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+        f.write(b"\0" * (offset - f.tell()))
+        f.write(np.ascontiguousarray(model.weights, dtype="<f4").tobytes())
+    os.replace(tmp, path)  # a running bot never maps a half-written model
+
+
+def load_model(path: Path) -> TopicModel:
+    """Map a saved model; only the buckets an utterance touches are paged in."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + 4)
+        if len(head) < len(MAGIC) + 4 or head[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a Unibot topic model")
+        (size,) = struct.unpack("<I", head[len(MAGIC) :])
+        header = json.loads(f.read(size))
+    if header.get("format") != MODEL_FORMAT:
+        raise ValueError(f"{path}: unsupported model format {header.get('format')!r}")
+    offset = -(-(len(MAGIC) + 4 + size) // ALIGN) * ALIGN
+    weights = np.memmap(
+        path,
+        dtype="<f4",
+        mode="r",
+        offset=offset,
+        shape=(len(header["labels"]), header["buckets"]),
+    )
+    return TopicModel(
+        header["labels"],
+        np.array(header["prior"]),
+        weights,
+        np.array(header["floor"]),
+        header["ngram"],
+        header["temperature"],
+    )
+
+
+# ---------- CLI ----------
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Train / try the Unibot topic model")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    tr = sub.add_parser("train", help="fit a model from labelled utterances")
+    tr.add_argument("labels", type=Path, help="CSV with text,topic columns")
+    tr.add_argument("-o", "--out", type=Path, default=Path("data/topic_model.nbm"))
+    tr.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS)
+    tr.add_argument("--ngram", type=int, default=DEFAULT_NGRAM)
+    tr.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    tr.add_argument("--holdout", type=float, default=0.2)
+    pr = sub.add_parser("predict", help="classify utterances with a saved model")
+    pr.add_argument("model", type=Path)
+    pr.add_argument("text", nargs="+")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "train":
+        texts, labels = read_labelled(args.labels)
+        model, report = train(
+            texts, labels, args.buckets, args.ngram, args.alpha, args.holdout
+        )
+        save_model(model, args.out)
+        size = args.out.stat().st_size
+        print(f"✅ Trained on {len(texts):,} utterances → {args.out} ({size / 1024:.0f} KiB)")
+        if "accuracy" in report:
+            print(
+                f"   held-out n={report['n']:,}  accuracy={report['accuracy']:.1%}  "
+                f"ECE={report['ece']:.3f}  temperature={report['temperature']:.2f}"
+            )
+        return
+    model = load_model(args.model)
+    for text in args.text:
+        topic, conf, hits = model.classify(text)
+        print(f"{topic or '-':>9}  {conf:.2f}  {hits}  {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# Unibot recommenders — rank every association (or sport) against one request
+# - each association becomes a row of an association×feature matrix, built once per
+#   catalog load from its name and its descriptive attributes (description, tags…);
+#   bookkeeping ones like the "source" tag or dates never count as cues
+# - a request (free text + the build_profile answers) becomes one feature vector;
+#   scoring is a single matrix–vector product, the top N come from np.partition
+# - features are themes (music, debate…) plus profile facets (calm/lively, solo/group,
+#   free); facets only count for associations whose data mentions them
+# - sports work the same way: a sport×attribute matrix from data/sport_attributes.csv
+#   (team, racket, indoor, solo, low_time…) scored against the four sports questions
+# - `python unibot_recommend.py "I like poetry" --vibe chill` ranks the catalog
+from __future__ import annotations
+import argparse
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from unibot_classify import inflections, tokens
+
+THEMES: Dict[str, FrozenSet[str]] = {
+    "international": frozenset(
+        {"international", "language", "culture", "cultural", "exchange", "global", "abroad"}
+    ),
+    "creative": frozenset(
+        {"art", "artsy", "artistic", "creative", "paint", "pottery", "draw", "craft", "design"}
+    ),
+    "debate": frozenset({"debate", "politics", "argue", "argument", "speaking", "speech"}),
+    "science": frozenset(
+        {"science", "tech", "technology", "code", "coding", "engineer", "robot", "math", "physics"}
+    ),
+    "writing": frozenset({"poetry", "poem", "poet", "write", "writing", "literature", "book"}),
+    "music": frozenset({"music", "band", "sing", "choir", "guitar", "jam", "concert"}),
+    "film": frozenset({"film", "movie", "cinema", "screening"}),
+    "business": frozenset(
+        {"startup", "entrepreneur", "entrepreneurship", "business", "finance", "pitch"}
+    ),
+    "wellness": frozenset({"yoga", "meditation", "wellness", "mindfulness", "wellbeing", "relax"}),
+}
+FACETS: Dict[str, FrozenSet[str]] = {
+    "calm": frozenset({"chill", "calm", "relaxed", "quiet", "cosy", "cozy", "gentle"}),
+    "lively": frozenset({"hype", "lively", "party", "loud", "energetic", "dance"}),
+    "solo": frozenset({"solo", "independent", "individual"}),
+    "group": frozenset({"team", "group", "friends", "together", "community"}),
+    "free": frozenset({"free", "cheap", "affordable"}),
+}
+FEATURES: Tuple[str, ...] = tuple(THEMES) + tuple(FACETS)
+VIBES: Dict[str, Tuple[str, ...]] = {  # build_profile Q1 → features it asks for
+    "chill": ("wellness", "calm"),
+    "hype": ("music", "lively"),
+    "creative": ("creative",),
+    "debate": ("debate",),
+    "tech": ("science",),
+    "startup": ("business",),
+    "international": ("international",),
+}
+TEXT_WEIGHT = 1.0  # per theme the free text mentions
+VIBE_WEIGHT = 1.0
+FACET_WEIGHT = 0.5  # energy / social mode / budget only nudge the ranking
+NAME_WEIGHT = 1.0  # a cue in the name counts more than one in the description
+ATTR_WEIGHT = 0.5
+TEXT_ATTRIBUTES = ("description", "tags", "category", "keywords")  # prose worth reading
+
+
+def _cue_lookup() -> Dict[str, int]:
+    lookup: Dict[str, int] = {}
+    for f, cues in enumerate(list(THEMES.values()) + list(FACETS.values())):
+        for cue in cues:
+            for form in inflections(cue):
+                lookup.setdefault(form, f)
+    return lookup
+
+
+CUES = _cue_lookup()  # word form → feature column
+COLUMN = {name: i for i, name in enumerate(FEATURES)}
+
+
+def feature_ids(text: str) -> List[int]:
+    """Feature columns whose cue words occur in ``text``."""
+    return sorted({CUES[w] for w in tokens(text) if w in CUES})
+
+
+def association_matrix(
+    names: Sequence[str], attributes: Mapping[str, Sequence[str]] = {}
+) -> np.ndarray:
+    """float32 len(names)×len(FEATURES); rows are unit length so long blurbs
+    with every keyword don't outrank a focused club. Only TEXT_ATTRIBUTES are read."""
+    matrix = np.zeros((len(names), len(FEATURES)), dtype=np.float32)
+    for attr in TEXT_ATTRIBUTES:
+        for i, text in enumerate(attributes.get(attr, ())[: len(names)]):
+            matrix[i, feature_ids(text)] = ATTR_WEIGHT
+    for i, name in enumerate(names):
+        matrix[i, feature_ids(name)] = NAME_WEIGHT
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def request_vector(text: str, profile: Optional[Mapping[str, str]] = None) -> np.ndarray:
+    """One request (free text + build_profile answers) as a feature vector."""
+    profile = profile or {}
+    q = np.zeros(len(FEATURES), dtype=np.float32)
+    np.add.at(q, feature_ids(text), TEXT_WEIGHT)
+    vibe = (profile.get("vibe") or "").lower()
+    for name in VIBES.get(vibe.strip(), ()):
+        q[COLUMN[name]] += VIBE_WEIGHT
+    np.add.at(q, feature_ids(vibe), VIBE_WEIGHT)  # "art", "poetry"… typed as a vibe
+    energy = (profile.get("energy") or "").lower()
+    social = (profile.get("social") or "").lower()
+    budget = (profile.get("budget") or "").lower()
+    facets = [
+        "calm" if "low" in energy else "lively" if "high" in energy else None,
+        "solo" if "solo" in social else "group" if "friend" in social else None,
+        "free" if "tight" in budget else None,
+    ]
+    for name in filter(None, facets):
+        q[COLUMN[name]] += FACET_WEIGHT
+    return q
+
+
+def ranked(names: Sequence[str], scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+    """Best ``k`` (name, score) with a positive score, best first; equal scores
+    keep the order of ``names``."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    cutoff = max(np.partition(scores, len(scores) - k)[len(scores) - k], 0.0)
+    # everything tied at the cutoff stays in, so the stable sort can pick by order
+    keep = np.flatnonzero(scores >= cutoff) if cutoff > 0 else np.flatnonzero(scores > 0)
+    best = keep[np.argsort(-scores[keep], kind="stable")[:k]]
+    return [(names[i], float(scores[i])) for i in best]
+
+
+@dataclass(frozen=True)
+class AssociationRecommender:
+    names: Tuple[str, ...]
+    matrix: np.ndarray  # len(names)×len(FEATURES), float32, unit rows
+
+    def scores(self, text: str, profile: Optional[Mapping[str, str]] = None) -> np.ndarray:
+        return self.matrix @ request_vector(text, profile)
+
+    def top(
+        self, text: str, profile: Optional[Mapping[str, str]] = None, n: int = 3
+    ) -> List[Tuple[str, float]]:
+        """Best ``n`` (association, score) with a positive score, best first;
+        equal scores keep the catalog order."""
+        return ranked(self.names, self.scores(text, profile), n)
+
+
+def build_recommender(
+    names: Sequence[str], attributes: Mapping[str, Sequence[str]] = {}
+) -> AssociationRecommender:
+    """``attributes``: attr → values aligned with ``names`` (e.g. description, tags)."""
+    return AssociationRecommender(tuple(names), association_matrix(names, attributes))
+
+
+# ---------- Sports ----------
+SPORT_ATTRIBUTES = Path("data/sport_attributes.csv")  # sport,attribute[,weight]
+PREF_WEIGHT = 3.0  # "what kind of sport" outweighs the rest
+PLACE_WEIGHT = 2.0
+PARTNER_WEIGHT = 1.5
+TIME_WEIGHT = 1.0
+
+
+def load_sport_attributes(path: Path = SPORT_ATTRIBUTES) -> Dict[str, Dict[str, float]]:
+    """sport → attribute → weight from a long CSV; {} when the file is missing."""
+    table: Dict[str, Dict[str, float]] = {}
+    try:
+        f = open(path, encoding="utf-8-sig", newline="")
+    except FileNotFoundError:
+        return table
+    with f:
+        for row in csv.DictReader(f):
+            sport = (row.get("sport") or "").strip().lower()
+            attr = (row.get("attribute") or "").strip().lower()
+            if sport and attr:
+                weight = (row.get("weight") or "").strip()
+                table.setdefault(sport, {})[attr] = float(weight) if weight else 1.0
+    return table
+
+
+@dataclass(frozen=True)
+class SportRecommender:
+    sports: Tuple[str, ...]  # lowercased, as available on campus
+    attributes: Tuple[str, ...]
+    column: Mapping[str, int]  # attribute → matrix column
+    forms: Mapping[str, str]  # word form → attribute ("teams" → team)
+    matrix: np.ndarray  # len(sports)×len(attributes), float32 weights
+
+    def request_vector(
+        self, pref: str, time_commit: str, place: str, partner: str
+    ) -> np.ndarray:
+        """The four sports questions as attribute weights."""
+        q = np.zeros(len(self.attributes), dtype=np.float32)
+
+        def want(attrs: Iterable[str], weight: float):
+            cols = [self.column[a] for a in attrs if a in self.column]
+            np.add.at(q, cols, weight)
+
+        # any attribute named in the answer, in any of its word forms
+        want({self.forms[w] for w in tokens(pref) if w in self.forms}, PREF_WEIGHT)
+        place, partner, time_commit = (
+            (place or "").lower(),
+            (partner or "").lower(),
+            (time_commit or "").lower(),
+        )
+        want([p for p in ("indoor", "outdoor") if p in place], PLACE_WEIGHT)
+        if "solo" in partner:
+            want(["solo"], PARTNER_WEIGHT)
+        elif "partner" in partner or "friends" in partner:
+            want(["social"], PARTNER_WEIGHT)
+        if "low" in time_commit:
+            want(["low_time"], TIME_WEIGHT)
+        elif "high" in time_commit:
+            want(["high_time"], TIME_WEIGHT)
+        return q
+
+    def top(
+        self, pref: str, time_commit: str, place: str, partner: str, k: int = 3
+    ) -> List[Tuple[str, float]]:
+        """Best ``k`` (sport, score), best first; ties keep the catalog order."""
+        q = self.request_vector(pref, time_commit, place, partner)
+        return ranked(self.sports, self.matrix @ q, k)
+
+
+def build_sport_recommender(
+    sports: Iterable[str], table: Optional[Mapping[str, Mapping[str, float]]] = None
+) -> SportRecommender:
+    """Matrix rows for the available ``sports`` (catalog order, deduplicated)."""
+    table = load_sport_attributes() if table is None else table
+    names = tuple(dict.fromkeys(s.strip().lower() for s in sports if s and s.strip()))
+    attributes = tuple(sorted({a for s in names for a in table.get(s, {})}))
+    column = {a: i for i, a in enumerate(attributes)}
+    forms: Dict[str, str] = {}
+    for attr in attributes:
+        for form in inflections(attr):
+            forms.setdefault(form, attr)
+    matrix = np.zeros((len(names), len(attributes)), dtype=np.float32)
+    for i, sport in enumerate(names):
+        for attr, weight in table.get(sport, {}).items():
+            matrix[i, column[attr]] = weight
+    return SportRecommender(names, attributes, column, forms, matrix)
+
+
+def recommend_sports(
+    rec: SportRecommender, pref: str, time_commit: str, place: str, partner: str
+) -> List[str]:
+    """Top 3 sports by weighted attribute match; fallback = first available."""
+    picks = [s.title() for s, _ in rec.top(pref, time_commit, place, partner, 3)]
+    return picks or [rec.sports[0].title() if rec.sports else "Basketball"]
+
+
+# ---------- CLI ----------
+def main(argv: Optional[List[str]] = None):
+    from unibot_catalog import build_catalog, load_columns
+
+    ap = argparse.ArgumentParser(description="Rank the catalog's associations")
+    ap.add_argument("text", nargs="?", default="")
+    ap.add_argument("--catalog", type=Path, default=Path("data/unilife.csv"))
+    ap.add_argument("--vibe", default="")
+    ap.add_argument("--energy", default="")
+    ap.add_argument("--social", default="")
+    ap.add_argument("--budget", default="")
+    ap.add_argument("-n", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    cat = build_catalog(load_columns(args.catalog))
+    rec = build_recommender(cat.associations, cat.attributes.get("associations", {}))
+    profile = {k: getattr(args, k) for k in ("vibe", "energy", "social", "budget")}
+    for name, score in rec.top(args.text, profile, args.n):
+        print(f"{score:6.3f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+# Unibot SQLite store — one indexed on-disk catalog shared by many bot processes
+# - import_catalog() copies the loaded catalog into SQLite (atomic file swap)
+# - Indexes on normalized sport/association names and on the event date
+# - Association trigrams and sport-name deletion variants are stored too, so
+#   fuzzy lookups are index scans
+# - Event dates are stored as written (no year = yearly) with a sort key per kind
+#   (mmdd, yyyymmdd or weekday); "soonest" and "between" are index range scans
+#   (plus a wrap-around for yearly rows) and years resolve at query time; events
+#   on the same day keep catalog (= id) order, like Catalog's EventTable
+# - CatalogStore answers the same queries as Catalog, so the flows take either,
+#   but keeps almost nothing in process memory
+# - One read-only connection per thread; close() drops them all when a reload
+#   retires the store
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from unibot_catalog import Columns, catalog_signature, norm_words
+from unibot_events import (
+    ONCE,
+    WEEKLY,
+    YEARLY,
+    EventDate,
+    extract_event_dates,
+    occurrence,
+    resolve,
+)
+from unibot_fuzzy import (
+    MIN_SIMILARITY,
+    Grams,
+    closest_name,
+    deletes,
+    min_shared,
+    nearest,
+    probe_grams,
+    reachable,
+    similarity,
+    top,
+    trigrams,
+)
+
+STORE_FORMAT = "7"
+GRAM_SEP = "|"  # trigrams are [a-z0-9 ] only
+JSON_LIST = "(SELECT value FROM json_each(?))"  # one parameter for any list size
+UNDATED = 3  # events.kind next to YEARLY / ONCE / WEEKLY
+LEAP_YEAR = 2000  # yearly spans are measured from it and the year before, so 29 Feb counts
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE sports (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, name_norm TEXT NOT NULL,
+    words INTEGER NOT NULL
+);
+CREATE INDEX sports_norm ON sports (name_norm);
+CREATE TABLE sport_variants (
+    variant TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (variant, id)
+) WITHOUT ROWID;
+CREATE TABLE associations (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, name_norm TEXT NOT NULL,
+    name_grams TEXT NOT NULL, name_size INTEGER NOT NULL, desc_grams TEXT NOT NULL
+);
+CREATE INDEX associations_norm ON associations (name_norm);
+CREATE TABLE assoc_trigrams (
+    gram TEXT NOT NULL, field INTEGER NOT NULL, id INTEGER NOT NULL,
+    PRIMARY KEY (gram, field, id)
+) WITHOUT ROWID;
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY, label TEXT NOT NULL, kind INTEGER NOT NULL,
+    start_key INTEGER, year INTEGER, month INTEGER, day INTEGER,
+    end_month INTEGER, end_day INTEGER, weekday INTEGER
+);
+CREATE INDEX events_start ON events (kind, start_key);  -- ties in id (rowid) order
+CREATE TABLE attributes (
+    entity TEXT NOT NULL, name TEXT NOT NULL, attr TEXT NOT NULL,
+    value TEXT NOT NULL, PRIMARY KEY (entity, name, attr)
+) WITHOUT ROWID;
+"""
+
+
+def signature_digest(source: Union[str, Path]) -> str:
+    """Changes whenever the source files or the store layout change."""
+    key = repr((STORE_FORMAT, catalog_signature(source)))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# ---------- Import ----------
+def import_catalog(db: Path, columns: Columns, signature: str = "") -> Path:
+    """Write ``columns`` to a fresh database and swap it in at ``db``."""
+    tmp = db.with_name(f"{db.name}.{os.getpid()}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    con = sqlite3.connect(tmp)
+    try:
+        con.executescript(SCHEMA)
+        with con:
+            con.execute("INSERT INTO meta VALUES ('signature', ?)", (signature,))
+            con.executemany(
+                "INSERT INTO sports (name, name_norm, words) VALUES (?, ?, ?)",
+                (
+                    (s, n, n.count(" ") + 1)
+                    for s in columns["sports"]
+                    for n in [norm_words(s)]
+                    if n
+                ),
+            )
+            sports = con.execute("SELECT id, name_norm FROM sports").fetchall()
+            con.executemany(
+                "INSERT OR IGNORE INTO sport_variants VALUES (?, ?)",
+                ((v, i) for i, name in sports for v in deletes(name)),
+            )
+            con.executemany(
+                "INSERT INTO associations VALUES (?, ?, ?, ?, ?, ?)",
+                _association_rows(columns),
+            )
+            con.executemany(
+                "INSERT INTO assoc_trigrams VALUES (?, ?, ?)", _trigram_rows(columns)
+            )
+            labels = columns["events"]
+            rows = [_event_row(*e) for e in zip(labels, extract_event_dates(labels))]
+            con.executemany(
+                "INSERT INTO events (label, kind, start_key, year, month, day,"
+                " end_month, end_day, weekday) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (row for row, _ in rows),
+            )
+            span = max((days for _, days in rows), default=0)
+            con.execute("INSERT INTO meta VALUES ('event_span', ?)", (str(span),))
+            con.executemany(
+                "INSERT OR IGNORE INTO attributes VALUES (?, ?, ?, ?)",
+                _attribute_rows(columns),
+            )
+        con.execute("ANALYZE")
+    finally:
+        con.close()
+    os.replace(tmp, db)  # open readers keep the old file until they reconnect
+    return db
+
+
+def _event_row(label: str, spec: Optional[EventDate]) -> Tuple[tuple, int]:
+    """(events row, days from start to end) — undated when no such day exists."""
+    if spec is not None and spec.month == 0:
+        return (label, WEEKLY, spec.weekday, *spec), 0
+    span = occurrence(spec, spec.year or LEAP_YEAR) if spec is not None else None
+    if span is None:
+        return (label, UNDATED, None) + (None,) * 6, 0
+    key = spec.month * 100 + spec.day
+    if spec.year:
+        return (label, ONCE, spec.year * 10_000 + key, *spec), (span[1] - span[0]).days
+    before = occurrence(spec, LEAP_YEAR - 1)  # "1 Oct – 1 Mar" reaches 29 Feb from here
+    days = max((s[1] - s[0]).days for s in (span, before) if s is not None)
+    return (label, YEARLY, key, *spec), days
+
+
+def _attribute_rows(columns: Columns) -> Iterator[tuple]:
+    for key, values in columns.items():
+        entity, dot, attr = key.partition(".")
+        if dot:
+            for name, value in zip(columns[entity], values):
+                if value:
+                    yield entity, name, attr, value
+
+
+def _association_grams(columns: Columns) -> Iterator[Tuple[int, str, Grams, Grams]]:
+    descriptions = columns.get("associations.description", ())
+    for i, name in enumerate(columns["associations"]):
+        desc = descriptions[i] if i < len(descriptions) else ""
+        yield i + 1, name, trigrams(name), trigrams(desc)
+
+
+def _association_rows(columns: Columns) -> Iterator[tuple]:
+    for i, name, name_grams, desc_grams in _association_grams(columns):
+        yield (
+            i,
+            name,
+            name.lower(),
+            GRAM_SEP.join(name_grams),
+            len(name_grams),
+            GRAM_SEP.join(desc_grams),
+        )
+
+
+def _trigram_rows(columns: Columns) -> Iterator[tuple]:
+    for i, _, name_grams, desc_grams in _association_grams(columns):
+        for field, grams in enumerate((name_grams, desc_grams)):  # 0 = name
+            for gram in grams:
+                yield gram, field, i
+
+
+# ---------- Queries ----------
+def _grams(joined: str) -> Grams:
+    return frozenset(joined.split(GRAM_SEP)) if joined else frozenset()
+
+
+def _md(d: date) -> int:
+    return d.month * 100 + d.day
+
+
+def _ymd(d: date) -> int:
+    return d.year * 10_000 + _md(d)
+
+
+def _md_ranges(first: date, last: date) -> List[Tuple[int, int]]:
+    """Inclusive mmdd ranges covering the days ``first``..``last`` (≤ one year)."""
+    if (last - first).days >= 365:
+        return [(101, 1231)]
+    if first.year == last.year:
+        return [(_md(first), _md(last))]
+    return [(_md(first), 1231), (101, _md(last))]
+
+
+class SportNames:
+    """Set-like view of the normalized sport names (membership is indexed)."""
+
+    def __init__(self, store: "CatalogStore"):
+        self._store = store
+
+    def __contains__(self, name: object) -> bool:
+        row = self._store._query(
+            "SELECT 1 FROM sports WHERE name_norm = ? LIMIT 1", (name,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._store._query("SELECT name_norm FROM sports ORDER BY id")
+        return (r[0] for r in rows)
+
+    def __len__(self) -> int:
+        return self._store._query("SELECT COUNT(*) FROM sports").fetchone()[0]
+
+
+class CatalogStore:
+    """Read-only Catalog backed by SQLite; one connection per thread.
+
+    ``close()`` closes every thread's connection, e.g. once a reload has
+    replaced the store; a thread that still queries it reconnects.
+    """
+
+    def __init__(self, db: Path):
+        self.db = Path(db)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._generation = 0  # bumped by close(); older thread connections are gone
+        self.sports_lower = SportNames(self)
+        self.sport_max_words = (
+            self._query("SELECT MAX(words) FROM sports").fetchone()[0] or 0
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            # closed from the reloading thread, hence check_same_thread=False
+            con = sqlite3.connect(
+                f"{self.db.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+            )
+            con.execute("PRAGMA cache_size = -512")  # KiB — stay lean per process
+            with self._lock:
+                self._connections.append(con)
+                local.con, local.generation = con, self._generation
+        return local.con.execute(sql, params)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for con in connections:
+            con.close()
+
+    def signature(self) -> Optional[str]:
+        row = self._query("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        return row[0] if row else None
+
+    def match_sport(self, text: str) -> Optional[Tuple[str, int]]:
+        """(sport, edits) for the sport named in ``text``, typos allowed."""
+        words = norm_words(text).split()
+        return closest_name(words, self.sport_max_words, self._nearest_sport)
+
+    def _nearest_sport(self, word: str) -> Optional[Tuple[str, int]]:
+        rows = self._query(
+            "SELECT DISTINCT s.name_norm FROM sport_variants v JOIN sports s ON s.id = v.id"
+            f" WHERE v.variant IN {JSON_LIST}",
+            (json.dumps(sorted(deletes(word))),),
+        )
+        return nearest(word, (r[0] for r in rows))
+
+    def association(self, name: str) -> Optional[str]:
+        row = self._query(
+            "SELECT name FROM associations WHERE name_norm = ? ORDER BY id LIMIT 1",
+            (name.lower(),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def first_association(self) -> Optional[str]:
+        row = self._query(
+            "SELECT name FROM associations ORDER BY id LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def match_associations(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Closest associations to ``text``; candidates come from the trigram index."""
+        query = trigrams(text)
+        if not query:
+            return []
+        frequency = {
+            (gram, field): n
+            for gram, field, n in self._query(
+                "SELECT gram, field, COUNT(*) FROM assoc_trigrams"
+                f" WHERE gram IN {JSON_LIST} GROUP BY gram, field",
+                (json.dumps(sorted(query)),),
+            )
+        }
+        n = len(query)
+        ids: Set[int] = set()
+        for field in (0, 1):
+            probe = probe_grams(
+                query,
+                lambda g: frequency.get((g, field), 0),
+                min_shared(n, MIN_SIMILARITY, desc=bool(field)),
+            )
+            if not probe:
+                continue
+            hits = self._query(
+                "SELECT t.id, COUNT(*), CASE WHEN t.field = 0 THEN a.name_size END"
+                " FROM assoc_trigrams t JOIN associations a ON a.id = t.id"
+                f" WHERE t.field = ? AND t.gram IN {JSON_LIST} GROUP BY t.id",
+                (field, json.dumps(probe)),
+            )
+            ids.update(reachable(hits, n - len(probe), n, MIN_SIMILARITY))
+        if not ids:
+            return []
+        rows = self._query(
+            "SELECT id, name, name_grams, desc_grams FROM associations"
+            f" WHERE id IN {JSON_LIST}",
+            (json.dumps(sorted(ids)),),
+        ).fetchall()
+        names = {r[0]: r[1] for r in rows}
+        scored = (
+            (r[0], similarity(query, _grams(r[2]), _grams(r[3]))) for r in rows
+        )
+        return [(names[i], s) for i, s in top(scored, k, MIN_SIMILARITY)]
+
+    def _events(
+        self, where: str, params: tuple = (), limit: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, EventDate]]:
+        """(id, label, date spec) of the events matching ``where``, in index order."""
+        sql = (
+            "SELECT id, label, year, month, day, end_month, end_day, weekday FROM events"
+            f" WHERE {where} ORDER BY start_key, id"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return ((r[0], r[1], EventDate(*r[2:])) for r in self._query(sql, params))
+
+    def _event_span(self) -> int:
+        row = self._query("SELECT value FROM meta WHERE key = 'event_span'").fetchone()
+        return int(row[0]) if row else 0
+
+    def soonest_events(self, k: int = 3, now: Optional[date] = None) -> List[str]:
+        """Next ``k`` events as seen from ``now``: a handful of index range scans
+        whose union is sure to hold the ``k`` soonest, resolved and merged here."""
+        now = now or date.today()
+        if k <= 0:
+            return []
+        began = now - timedelta(days=self._event_span())  # still running if this long
+        once, yearly, weekly = f"kind = {ONCE}", f"kind = {YEARLY}", f"kind = {WEEKLY}"
+        scans = [
+            self._events(f"{once} AND start_key >= ?", (_ymd(now),), k),
+            self._events(f"{once} AND start_key BETWEEN ? AND ?", (_ymd(began), _ymd(now))),
+            # yearly rows in calendar order from today, then wrapping into next year;
+            # 29 Feb is off that order in common years, so it is fetched on its own
+            self._events(f"{yearly} AND start_key >= ? AND start_key != 229", (_md(now),), k),
+            self._events(f"{yearly} AND start_key < ? AND start_key != 229", (_md(now),), k),
+            self._events(f"{yearly} AND start_key = 229", (), k),
+        ]
+        scans += [
+            self._events(f"{yearly} AND start_key BETWEEN ? AND ?", r)
+            for r in _md_ranges(began, now)
+        ]
+        found: Dict[int, Tuple[date, int, str]] = {}
+        for rows in scans:
+            for i, label, spec in rows:
+                span = resolve(spec, now)
+                if span is not None and span[1] >= now:
+                    found[i] = (span[0], i, label)
+        for offset in range(7):  # weekly rows, one weekday at a time
+            day = now + timedelta(days=offset)
+            if sum(start < day for start, _, _ in found.values()) >= k:
+                break  # k events before this weekday comes round
+            for i, label, _ in self._events(f"{weekly} AND start_key = ?", (day.weekday(),), k):
+                found[i] = (day, i, label)
+        out = [label for _, _, label in sorted(found.values())[:k]]
+        if len(out) < k:
+            out += [label for _, label, _ in self._events(f"kind = {UNDATED}", (), k - len(out))]
+        return out
+
+    def events_between(self, first: date, last: date) -> List[str]:
+        """Events happening on any day in ``[first, last]``, in date order, once each."""
+        began = first - timedelta(days=self._event_span())
+        found: List[Tuple[date, int, str]] = []
+        for i, label, spec in self._events(
+            f"kind = {ONCE} AND start_key BETWEEN ? AND ?", (_ymd(began), _ymd(last))
+        ):
+            start, end = occurrence(spec, spec.year)
+            if end >= first:
+                found.append((start, i, label))
+        for year in range(began.year, last.year + 1):
+            lo, hi = max(began, date(year, 1, 1)), min(last, date(year, 12, 31))
+            for i, label, spec in self._events(
+                f"kind = {YEARLY} AND start_key BETWEEN ? AND ?", (_md(lo), _md(hi))
+            ):
+                span = occurrence(spec, year)
+                if span is not None and span[1] >= first:
+                    found.append((span[0], i, label))
+        for offset in range(min(7, (last - first).days + 1)):
+            day = first + timedelta(days=offset)
+            for i, label, _ in self._events(f"kind = {WEEKLY} AND start_key = ?", (day.weekday(),)):
+                found.append((day, i, label))
+        found.sort()
+        seen: Set[int] = set()
+        out: List[str] = []
+        for _, i, label in found:
+            if i not in seen:  # a window over a year meets a yearly row twice
+                seen.add(i)
+                out.append(label)
+        return out
+
+
+def open_store(
+    db: Union[str, Path], source: Union[str, Path], load_columns
+) -> CatalogStore:
+    """Open ``db``, (re)importing from ``source`` first if it is missing or stale.
+
+    ``load_columns`` is called only when an import is needed.
+    """
+    db = Path(db)
+    sig = signature_digest(source)
+    if db.exists():
+        try:
+            store = CatalogStore(db)
+            if store.signature() == sig:
+                return store
+            store.close()  # stale — imported again below
+        except sqlite3.DatabaseError:
+            pass  # half-copied or foreign file — rebuild it
+    import_catalog(db, load_columns(), sig)
+    return CatalogStore(db)
@@ -0,0 +1,141 @@
+# Unibot web — Gradio chat over the unibot_dialog state machine
+# - one catalog per process, loaded once and hot-reloaded by a CatalogWatcher; every
+#   browser tab reads the same object (catalogs and stores are read-only)
+# - each tab keeps its own dialog Session in a gr.State, so students never share a
+#   conversation; a closed chat greets again on the next message
+# - answers run on Gradio's queue: at most --concurrency handlers at once, at most
+#   --queue-size requests waiting (the rest are turned away), so a burst of students
+#   cannot pile unbounded work onto one process
+# - throughput (`python bench/web.py`, simulated students through the real server):
+#   ~20 turns/s for 20–100 concurrent students on a 1-core VM that also runs the
+#   clients (p50 0.9 s at 20, 5.6 s at 100). The server spends ~7 ms CPU per turn,
+#   almost all of it Gradio's HTTP/queue/serialisation (a dialog step is ~6 µs),
+#   so expect roughly 140 turns/s per core it has to itself
+# - source only: the console EXE builds exclude gradio
+# - `python unibot_web.py --port 7860 --concurrency 8 --queue-size 256`
+from __future__ import annotations
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import gradio as gr
+
+from Unibot import CSV, read_columns, report_reload_error
+from unibot_catalog import CatalogWatcher, build_catalog
+from unibot_dialog import Session, start, turn
+from unibot_store import CatalogStore, open_store
+
+DEFAULT_CONCURRENCY = 8  # handlers running at once
+DEFAULT_QUEUE_SIZE = 256  # requests waiting for a handler before new ones are refused
+
+Message = Dict[str, str]
+
+
+def bot_messages(lines: List[str]) -> List[Message]:
+    return [{"role": "assistant", "content": line.strip()} for line in lines]
+
+
+def greeting() -> List[Message]:
+    return bot_messages(start()[1])
+
+
+def respond(
+    watcher: CatalogWatcher, text: str, history: List[Message], session: Session
+) -> Tuple[str, List[Message], Session]:
+    """One answer: (cleared textbox, chat history, next session)."""
+    text = (text or "").strip()
+    if not text:
+        return "", history, session
+    session, lines = turn(watcher.current(), session, text)
+    history = history + [{"role": "user", "content": text}] + bot_messages(lines)
+    if session.closed:
+        session, lines = start()  # the tab stays open: next message is a new chat
+        history += bot_messages(lines)
+    return "", history, session
+
+
+def build_app(
+    watcher: CatalogWatcher,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    queue_size: Optional[int] = DEFAULT_QUEUE_SIZE,
+) -> gr.Blocks:
+    with gr.Blocks(title="Unibot") as app:
+        chat = gr.Chatbot(value=greeting(), label="Unibot", height=520)
+        session = gr.State(Session())
+        box = gr.Textbox(placeholder="Type your answer and press Enter", show_label=False)
+        box.submit(
+            lambda text, history, s: respond(watcher, text, history, s),
+            [box, chat, session],
+            [box, chat, session],
+            api_name="respond",
+        )
+    return app.queue(default_concurrency_limit=concurrency, max_size=queue_size)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Unibot — campus life chat in the browser")
+    ap.add_argument(
+        "--catalog",
+        default=str(CSV),
+        help="catalog CSV, a directory of CSVs, or a glob like 'data/*/*.csv'",
+    )
+    ap.add_argument(
+        "--store",
+        default=None,
+        help="serve lookups from this SQLite file instead of holding the catalog in memory",
+    )
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7860)
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="answers computed at the same time",
+    )
+    ap.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="answers allowed to wait for a free slot (0 = unbounded)",
+    )
+    ap.add_argument(
+        "--max-sessions",
+        type=int,
+        default=10_000,
+        help="chat sessions kept in memory; the oldest are dropped beyond this",
+    )
+    ap.add_argument(
+        "--watch-interval",
+        type=float,
+        default=2.0,
+        help="seconds between checks of the catalog for edits (0 disables hot reload)",
+    )
+    return ap.parse_args(argv)
+
+
+def main(argv: List[str] | None = None):
+    args = parse_args(argv)
+
+    def load():
+        if args.store:
+            return open_store(args.store, args.catalog, lambda: read_columns(source=args.catalog))
+        return build_catalog(read_columns(source=args.catalog))
+
+    watcher = CatalogWatcher(
+        args.catalog,
+        load,
+        interval=args.watch_interval,
+        on_error=report_reload_error,
+        on_retire=CatalogStore.close if args.store else None,
+    )
+    if args.watch_interval > 0:
+        watcher.start()
+    app = build_app(watcher, args.concurrency, args.queue_size or None)
+    app.launch(
+        server_name=args.host,
+        server_port=args.port,
+        state_session_capacity=args.max_sessions,
+    )
+
+
+if __name__ == "__main__":
+    main()